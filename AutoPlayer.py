@@ -14,6 +14,7 @@ MODE = 0  # Default mode is random moves.
 
 STEP_LIMIT = -1  # no step limit if negative
 WAIT_TIME_PER_MOVE = 1.0
+SEARCH_NODES = 300  # Iterations of the tree search per move in mode 4
 
 print("\nWelcome to the AutoPlayer for SOLUZION!")
 print("The problem, puzzle or game is: " + problem_name + "\n\n")
@@ -25,10 +26,13 @@ def set_policy():
 0. Random
 1. First legal move
 2. Last legal move
-Enter 0, 1, or 2: >> ''')
+3. Suggested move (the right answer, the best Miner route), random otherwise
+4. Tree search (Monte Carlo, SEARCH_NODES iterations per move)
+5. Economy table in the menu, suggested moves in the challenges
+Enter 0, 1, 2, 3, 4, or 5: >> ''')
     try:
         MODE = int(answer)
-        if MODE < 0 or MODE > 2:
+        if MODE < 0 or MODE > 5:
             print("Illegal mode number. Using 0 (random).")
             MODE = 0
     except:
@@ -48,6 +52,7 @@ def player_mainloop():
     STEP = 0
 
     PROBLEM.render_state(CURRENT_STATE)
+    SOLUZION_Loader.report_first_state(PROBLEM)
     if not policy_is_set:
         set_policy()
         policy_is_set = True
@@ -60,7 +65,8 @@ You have solved the problem by reaching a goal state.'
 ''')
             time.sleep(4 * WAIT_TIME_PER_MOVE)
             print("Starting a new game...")
-            CURRENT_STATE = PROBLEM.copy_state(PROBLEM.INITIAL_STATE)
+            # A fresh seed for each game, otherwise every restart would replay the first game
+            CURRENT_STATE = PROBLEM.new_game() if hasattr(PROBLEM, "new_game") else PROBLEM.copy_state(PROBLEM.INITIAL_STATE)
 
         applicability_vector = get_applicability_vector(CURRENT_STATE)
         # print("applicability_vector = "+str(applicability_vector))
@@ -74,6 +80,12 @@ You have solved the problem by reaching a goal state.'
             command = legal_op_numbers[0]
         elif MODE == 2:
             command = legal_op_numbers[-1]
+        elif MODE == 3:
+            command = suggested_op_number(CURRENT_STATE, legal_op_numbers)
+        elif MODE == 4:
+            command = searched_op_number(CURRENT_STATE)
+        elif MODE == 5:
+            command = economy_op_number(CURRENT_STATE, legal_op_numbers)
 
         try:
             i = int(command)
@@ -98,9 +110,34 @@ You have solved the problem by reaching a goal state.'
 
 def get_applicability_vector(s):
     # print("OPERATORS: "+str(OPERATORS))
+    if hasattr(s, "applicability_vector"):
+        return s.applicability_vector()  # Cached by the state itself
     return [op.is_applicable(s) for op in OPERATORS]
 
 
+def suggested_op_number(s, legal_op_numbers):
+    import InfoFlow_Economy
+    return InfoFlow_Economy.suggested_op_index(OPERATORS, s, legal_op_numbers, random)
+
+
+SEARCH = None
+
+
+def searched_op_number(s):
+    # One search object for the whole session, so its transposition table carries over from move to move
+    global SEARCH
+    if SEARCH is None:
+        import InfoFlow_Search
+        SEARCH = InfoFlow_Search.GameTreeSearch(PROBLEM, nodes=SEARCH_NODES)
+    return OPERATORS.index(SEARCH.best_operator(s))
+
+
+def economy_op_number(s, legal_op_numbers):
+    # The menu policy is solved once per process, on the first menu move
+    import InfoFlow_Economy
+    return InfoFlow_Economy.economy_op_index(OPERATORS, s, legal_op_numbers, random)
+
+
 def apply_one_op():
     """Populate a popup menu with the names of currently applicable
        operators, and let the user choose which one to apply."""
@@ -113,10 +150,11 @@ def apply_one_op():
 def applicable_ops(s):
     """Returns the subset of OPERATORS whose preconditions are
        satisfied by the state s."""
-    return [o for o in OPERATORS if o.is_applicable(s)]
+    return [o for o, applicable in zip(OPERATORS, get_applicability_vector(s)) if applicable]
 
 
-import sys, importlib.util
+import sys
+import SOLUZION_Loader
 
 # Get the PROBLEM name from the command-line arguments
 
@@ -137,18 +175,13 @@ problem_name = sys.argv[1]
 print("problem_name = " + problem_name)
 
 try:
-    spec = importlib.util.spec_from_file_location(problem_name, problem_name + ".py")
-    PROBLEM = spec.loader.load_module()
-    spec.loader.exec_module(PROBLEM)
+    PROBLEM = SOLUZION_Loader.load_problem(problem_name)
 except Exception as e:
     print(e)
     exit(1)
 
 try:
-    spec = importlib.util.spec_from_file_location(problem_name + '_Array_VIS_FOR_TK',
-                                                  problem_name + '_Array_VIS_FOR_TK.py')
-    VIS = spec.loader.load_module()
-    spec.loader.exec_module(VIS)
+    VIS = SOLUZION_Loader.load_module(problem_name + '_Array_VIS_FOR_TK')
     print("Using TK vis routine")
     PROBLEM.render_state = VIS.render_state
     VIS.initialize_vis()
@@ -30,18 +30,33 @@ to pay off your debt. Today, you will be facing your first challenge from this p
 # </METADATA>
 
 # <COMMON_CODE>
-from copy import deepcopy
+import json
+import os
+import sqlite3
+from bisect import bisect_right
 from enum import Enum
 from itertools import chain
-from random import randrange, choice
-from typing import List, Dict
+from random import Random, getrandbits
+from threading import Lock
+from typing import List, Dict, NamedTuple
 
 
 class Debug:
     debug = False  # DEBUG
 
 
+def derive_seed(seed: int) -> int:
+    # SplitMix64 step: successor states get well mixed, reproducible seeds without sharing any RNG object
+    seed = (seed + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    seed = ((seed ^ (seed >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    seed = ((seed ^ (seed >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return seed ^ (seed >> 31)
+
+
 class PlayerInfo:
+    __slots__ = ("_difficulty_level", "score", "finished", "unfinished", "canceled", "challenge_count", "money", "_debt", "_energy",
+                 "info_got", "current_challenge", "set_game_finished", "is_game_finished")
+
     def __init__(self, difficulty_level: int = 0,
                  score: int = 0,
                  finished: int = 0,
@@ -99,35 +114,34 @@ class PlayerInfo:
     def add_info_got(self, num: int):
         self.info_got += num
 
+    def key(self) -> tuple:
+        return (self._difficulty_level, self.score, self.finished, self.unfinished, self.canceled, self.challenge_count,
+                self.money, self._debt, self._energy, self.info_got,
+                self.current_challenge.key() if self.current_challenge else None,
+                self.set_game_finished, self.is_game_finished)
+
     def __eq__(self, other):
         if other is self:
             return True
-        if other is None:
+        if not isinstance(other, PlayerInfo):
             return False
-        return (self.energy is other.energy
-                and self.score is other.score
-                and self.finished is other.finished
-                and self.unfinished is other.unfinished
-                and self.canceled is other.canceled
-                and self.challenge_count is other.challenge_count
-                and self.money is other.money
-                and self.debt is other.debt
-                and self.energy is other.energy
-                and self.info_got is other.info_got
-                and self.difficulty_level is other.difficulty_level
-                and self.has_accepted_challenge() is other.has_accepted_challenge()
-                and self.current_challenge is other.current_challenge
-                and self.set_game_finished is other.set_game_finished
-                and self.is_game_finished is other.is_game_finished)
+        return self.key() == other.key()
 
-    def __str__(self):
+    def __hash__(self):
+        return hash(self.key())
+
+    @staticmethod
+    def energy_bar(energy: int) -> str:
         block_full, block_three_forth, block_half, block_one_fourth, block_empty = '█', '▊', '▌', '▎', '　'
-        energy_blocks = block_full * (self.energy // 20)
-        energy_rest = self.energy % 20
+        energy_blocks = block_full * (energy // 20)
+        energy_rest = energy % 20
         energy_rest = block_three_forth if energy_rest >= 15 else block_half if energy_rest >= 10 else block_one_fourth if energy_rest >= 5 else ''
         energy_spaces = block_empty * max(0, 5 - len(energy_blocks) - len(energy_rest))
+        return f"{energy:3}▕{energy_blocks}{energy_rest}{energy_spaces}▏"
+
+    def __str__(self):
         return (f"Player Stats:"
-                f"\tEnergy: {self.energy:3}▕{energy_blocks}{energy_rest}{energy_spaces}▏"
+                f"\tEnergy: {PlayerInfo.energy_bars[self.energy]}"
                 f"\tScore: {self.score}"
                 f"\tFinished/All Challenges: {self.finished}/{self.challenge_count}"
                 f"\tMoney/Debt: ${self.money}/${self.debt}"
@@ -142,6 +156,10 @@ class PlayerInfo:
                           info.set_game_finished, info.is_game_finished)
 
 
+# The energy bar of every energy from 0 to 100, PlayerInfo.energy keeps the energy in that range
+PlayerInfo.energy_bars = tuple(PlayerInfo.energy_bar(energy) for energy in range(101))
+
+
 class OperatorIds(Enum):
     MENU_CONTINUE = "Continue..."
     CHALLENGE_ACCEPT = "Accept the challenge"
@@ -152,6 +170,8 @@ class OperatorIds(Enum):
 
 
 class Operator:
+    __slots__ = ("name", "id")
+
     def __init__(self, name, id):
         self.name = name
         self.id = id
@@ -172,8 +192,11 @@ class Challenge:
     score_correct_multiplier_level = 100
     score_cancel_multiplier_level = -100
     money_cancel_multiplier_level = -300
+    money_decline = -100
     energy_accept_multiplier_level = 5
 
+    __slots__ = ("name", "level")
+
     def __init__(self, name: str, level: int):
         self.name = name
         self.level = level
@@ -181,8 +204,9 @@ class Challenge:
     def accept(self, p: 'PlayerInfo') -> None:
         p.energy -= self.energy_consume()
 
-    def decline(self, p: 'PlayerInfo') -> None:
-        p.money -= 100
+    @staticmethod
+    def decline(p: 'PlayerInfo') -> None:
+        p.money += Challenge.money_decline
         p.challenge_count += 1
         p.difficulty_level -= 1
 
@@ -212,53 +236,137 @@ class Challenge:
         p.difficulty_level -= 1
 
     def energy_consume(self):
-        return (self.level + 5) * Challenge.energy_accept_multiplier_level
+        return Challenge.energy_of_level(self.level)
+
+    @staticmethod
+    def energy_of_level(level: int) -> int:
+        return (level + 5) * Challenge.energy_accept_multiplier_level
 
     def preview(self) -> str:
         return f"{self.name}(Level: {self.level})"
 
+    def key(self) -> tuple:
+        # Canonical content of the challenge including the player's progress, used for hashing and equality
+        return type(self).__name__, self.level
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if not isinstance(other, Challenge):
+            return False
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
     def __str__(self):
         return self.preview()
 
     def clone(self):
+        # Clones share their payload with the original (copy-on-write): a challenge must never mutate a shared
+        # container in place, but rebind its attribute to an updated copy of only the part that changes.
         raise NotImplementedError()
 
 
 class State:
-    def __init__(self, old: 'State' = None):
+    # Ids of the operators applicable to every state of this type, dynamic_op_ids() adds the guarded ones
+    op_ids = frozenset((OperatorIds.FINISH_ROUND, OperatorIds.PAY_DEBT))
+
+    energy_recovered_per_round = 80  # Recover 80% of total energy after each round
+    debt_growth_per_round = 1.03  # Add 3% debt according to the remaining debt after each round
+
+    # The part of goal_message() that is the same for every game
+    goal_tips = ("Maybe you did not realize, but here is how much information you just received "
+                 "(not reach since you are actually dealing with them) in one game. "
+                 "Will you feel tired after finishing one day’s work but actually not having too much workload? "
+                 "It is mostly because you are reaching information while you did not notice. "
+                 "Emails, videos, Facebook and twitter: all kinds of information are attacking your brain. "
+                 "Also, this is why we make ‘Info Flow’ for this wicked problem (information overload), "
+                 "and here is a tip for all of you who played this game:\n"
+                 "    First, Stop using your smart device for a while and let your brain take a break. "
+                 "Besides, do not process too much data/task at the same time. Learning to make planners, shifting subjects you are working on are also good ideas. "
+                 "Make sure, sometimes you have to reject reaching some information once you feel like that is too much for you to deal with. Once you feel tired, "
+                 "please temporary escape: turn off your smart device and let your brain rest for a bit.\n\n"
+                 "More tips about how to deal with information overload, check https://www.workzone.com/blog/information-overload/")
+
+    __slots__ = ("player", "challenge", "round", "selected_operator", "is_goal_state", "_applicable_op_ids", "seed",
+                 "_description", "_text")
+
+    def __init__(self, old: 'State' = None, seed: int = None):
         if old:
             self.player = PlayerInfo.clone(old.player)
             self.challenge = old.challenge.clone() if old.challenge else None
             self.round = old.round
+            self.seed = derive_seed(old.seed)
         else:
             self.player = PlayerInfo()
             self.challenge = None
             self.round = 1
+            self.seed = seed if seed is not None else getrandbits(64)
         self.selected_operator = None
+        self.is_goal_state = False
+        self._applicable_op_ids = None
+        self._description = None
+        self._text = None
+
+    def rng(self) -> 'Random':
+        # Every random decision made by or for this state comes from its own seed, so a seed and a sequence of
+        # operators replay a game exactly, and games in different threads or processes never share RNG state
+        return Random(self.seed)
+
+    def dynamic_op_ids(self):
+        return ()
+
+    def applicable_op_ids(self) -> frozenset:
+        # Computed once per state, states are not modified after they are handed out by apply_operator
+        if self._applicable_op_ids is None:
+            dynamic = self.dynamic_op_ids()
+            self._applicable_op_ids = self.op_ids.union(dynamic) if dynamic else self.op_ids
+        return self._applicable_op_ids
+
+    def applicability_vector(self) -> tuple:
+        return applicability_vector_of(self.applicable_op_ids())
+
+    def suggested_op_id(self, node_budget: int = 20000):
+        # Id of the operator a solver recommends in this state, None where no solver applies. A node_budget of 0 asks
+        # for a quick heuristic answer, e.g. for the rollouts of a tree search.
+        return None
 
     def is_applicable_operator(self, op: 'Operator') -> bool:
-        return op.id is OperatorIds.FINISH_ROUND or op.id is OperatorIds.PAY_DEBT
+        return op.id in self.applicable_op_ids()
 
     def apply_operator(self, op: 'Operator') -> 'State':
+        # transitions maps an operator id to its handler, each state type extends the table of its base class
         self.store_operator(op)
+        return self.transitions[op.id](self, op)
+
+    def apply_finish_round(self, op: 'Operator') -> 'State':
         ns = copy_state(self)
-        if op.id is OperatorIds.FINISH_ROUND:
-            ns.round += 1
-            ns.player.energy += 80  # Recover 80% of total energy after each round
-            ns.player.debt = int(ns.player.debt * 1.03)  # Add 3% debt according to the remaining debt after each round
-        elif op.id is OperatorIds.PAY_DEBT:
-            if not ns.player.is_game_finished:
-                if ns.player.money > 0:
-                    to_pay = min(ns.player.debt, ns.player.money)
-                    ns.player.debt -= to_pay
-                    ns.player.money -= to_pay
-                    return MessageDisplayState.show_message(ns.check_win_lose_state(), "Great!", f"${to_pay} is paid off your debt.")
-                else:
-                    return MessageDisplayState.show_message(ns.check_win_lose_state(), "Failed!", "You don't have any money to pay off your debt!")
-            else:
-                return MessageDisplayState.show_message(ns.check_win_lose_state(), "Failed!", "You have already paid all the debt!")
+        ns.start_round()
         return ns.check_win_lose_state()
 
+    def start_round(self) -> None:
+        # Turns this fresh copy into the first state of the next round
+        self.round += 1
+        self.player.energy += State.energy_recovered_per_round
+        self.player.debt = int(self.player.debt * State.debt_growth_per_round)
+
+    def apply_pay_debt(self, op: 'Operator') -> 'State':
+        ns = copy_state(self)
+        if not ns.player.is_game_finished:
+            if ns.player.money > 0:
+                to_pay = min(ns.player.debt, ns.player.money)
+                ns.player.debt -= to_pay
+                ns.player.money -= to_pay
+                return MessageDisplayState.show_message(ns.check_win_lose_state(), "Great!", f"${to_pay} is paid off your debt.")
+            else:
+                return MessageDisplayState.show_message(ns.check_win_lose_state(), "Failed!", "You don't have any money to pay off your debt!")
+        else:
+            return MessageDisplayState.show_message(ns.check_win_lose_state(), "Failed!", "You have already paid all the debt!")
+
+    transitions = {OperatorIds.FINISH_ROUND: apply_finish_round,
+                   OperatorIds.PAY_DEBT: apply_pay_debt}
+
     def store_operator(self, op: 'Operator'):
         self.selected_operator = op
 
@@ -289,10 +397,10 @@ class State:
         return self
 
     def __is_goal(self) -> bool:
-        return self.player.debt is 0
+        return self.player.debt == 0
 
     def is_goal(self) -> bool:
-        if not self.player.is_game_finished and self.player.set_game_finished and "is_goal_state" in self.__dict__ and self.__is_goal():
+        if not self.player.is_game_finished and self.player.set_game_finished and self.is_goal_state and self.__is_goal():
             self.player.is_game_finished = True
             return True
         else:
@@ -307,149 +415,428 @@ class State:
                 + ("no challenge is" if self.player.canceled is 0 else f"{self.player.canceled} challenge{'s are' if self.player.challenge_count > 1 else ' is'}") + " canceled, "
                 + ("and no challenge is" if declined is 0 else f"and {declined} challenge{'s are' if declined > 1 else ' is'}") + " declined. "
                 + f"You read about {self.player.info_got + 40} pieces of information during this game. "
-                  f"Maybe you did not realize, but here is how much information you just received "
-                  f"(not reach since you are actually dealing with them) in one game. "
-                  f"Will you feel tired after finishing one day’s work but actually not having too much workload? "
-                  f"It is mostly because you are reaching information while you did not notice. "
-                  f"Emails, videos, Facebook and twitter: all kinds of information are attacking your brain. "
-                  f"Also, this is why we make ‘Info Flow’ for this wicked problem (information overload), "
-                  f"and here is a tip for all of you who played this game:\n"
-                  f"    First, Stop using your smart device for a while and let your brain take a break. "
-                  f"Besides, do not process too much data/task at the same time. Learning to make planners, shifting subjects you are working on are also good ideas. "
-                  f"Make sure, sometimes you have to reject reaching some information once you feel like that is too much for you to deal with. Once you feel tired, "
-                  f"please temporary escape: turn off your smart device and let your brain rest for a bit.\n\n"
-                  f"More tips about how to deal with information overload, check https://www.workzone.com/blog/information-overload/")
+                + State.goal_tips)
 
     def describe_state(self) -> str:
+        # Formatted once per state like applicable_op_ids(), clients print and render it after every step
+        if self._description is None:
+            self._description = self.format_description()
+        return self._description
+
+    def format_description(self) -> str:
         return ""
 
+    def key(self) -> tuple:
+        # Canonical key of the state: state type, round, player stats (including the accepted challenge's progress)
+        # and whatever the state type adds in progress_key(). Equal keys mean interchangeable states.
+        return (type(self).__name__, self.round, self.player.key(), self.challenge.key() if self.challenge else None,
+                self.is_goal_state, self.progress_key())
+
+    def progress_key(self) -> tuple:
+        return ()
+
     def __eq__(self, s):
-        if self == s:
+        if s is self:
             return True
-        if s is None:
+        if not isinstance(s, State):
             return False
-        return type(self) is type(s) and self.player == s.player and self.challenge == s.challenge and self.round == s.round
+        return type(self) is type(s) and self.key() == s.key()
+
+    def __hash__(self):
+        return hash(self.key())
 
     def __str__(self):
-        return f"Round {self.round}\n{self.player}"
+        if self._text is None:
+            self._text = self.format_text()
+        return self._text
 
-    def __hash(self):
-        return hash(str(self))
+    def format_text(self) -> str:
+        return f"Round {self.round}\n{self.player}"
 
 
 # Tell the background of the game, introduce the game mechanics, and declare the goal
 class GameStartState(State):
     text_background = PROBLEM_DESC
 
-    def __init__(self, old: 'State' = None):
-        super().__init__(old)
+    op_ids = frozenset((OperatorIds.MENU_CONTINUE,))
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return op.id is OperatorIds.MENU_CONTINUE
+    __slots__ = ()
+
+    def __init__(self, old: 'State' = None, seed: int = None):
+        super().__init__(old, seed)
 
     def apply_operator(self, op: 'Operator'):
         self.store_operator(op)
         return ChallengeMenuState(self)
 
-    def describe_state(self) -> str:
+    def format_description(self) -> str:
         return f"{GameStartState.text_background}"
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
 
 class ChallengeMenuState(State):
+    # The offer is drawn from offer_seed at the player's level only when it is first read, and copies of a menu state
+    # (paying the debt, copy.copy) keep the offer of the original, drawn or not. Declining and a new round bring a new one.
+    # With ChallengePool.installed the offer does not follow from the seed, so it is taken from the pool right away.
+    __slots__ = ("offer_seed", "_offer", "_pooled")
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
-        self.random_challenge = list(self.__random_challenge())
-        self.random_challenge[0] = self.random_challenge[0].clone()
+        if isinstance(old, ChallengeMenuState):
+            self.offer_seed, self._offer, self._pooled = old.offer_seed, old._offer, old._pooled
+        else:
+            self.new_offer()
 
-    def __random_challenge(self):
-        c, s, _ = choice(Challenges.all)
-        return c(self.player.difficulty_level), s
+    def new_offer(self) -> None:
+        self.offer_seed, self._offer, self._pooled = self.seed, None, ChallengePool.installed is not None
+        if self._pooled:
+            self.random_challenge
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return (super().is_applicable_operator(op)
-                or (not self.has_challenge()
-                    and ((self.player.energy >= self.random_challenge[0].energy_consume() and op.id is OperatorIds.CHALLENGE_ACCEPT)
-                         or op.id is OperatorIds.CHALLENGE_DECLINE)))
+    @property
+    def random_challenge(self) -> tuple:
+        # (offered challenge, state type playing it)
+        if self._offer is None:
+            rng = Random(self.offer_seed)
+            kind = rng.randrange(len(Challenges.all))
+            c, s, _, _ = Challenges.all[kind]
+            pool = ChallengePool.installed
+            challenge = pool.take(self.player.difficulty_level, kind) if self._pooled else c(self.player.difficulty_level, rng)
+            self._offer = challenge, s
+        return self._offer
+
+    def start_round(self) -> None:
+        super().start_round()
+        self.new_offer()
+
+    def dynamic_op_ids(self):
+        if self.has_challenge():
+            return ()
+        # The offer is of the player's level, so its energy is known without drawing it
+        if self.player.energy >= Challenge.energy_of_level(self.player.difficulty_level):
+            return OperatorIds.CHALLENGE_ACCEPT, OperatorIds.CHALLENGE_DECLINE
+        return OperatorIds.CHALLENGE_DECLINE,
+
+    def apply_accept(self, op: 'Operator'):
+        challenge, state_type = self.random_challenge
+        ns = state_type(self)
+        ns.player.current_challenge = challenge.clone()  # The offer may be shared with copies of this state
+        ns.player.current_challenge.accept(ns.player)
+        return ns.check_win_lose_state()
 
-    def apply_operator(self, op: 'Operator'):
-        self.store_operator(op)
-        if super().is_applicable_operator(op):
-            return super().apply_operator(op)
-        if op.id is OperatorIds.CHALLENGE_ACCEPT:
-            ns = self.random_challenge[1](self)
-            ns.player.current_challenge = self.random_challenge[0]
-            ns.player.current_challenge.accept(ns.player)
-            return ns.check_win_lose_state()
-        elif op.id is OperatorIds.CHALLENGE_DECLINE:
-            ns = ChallengeMenuState(old=self)
-            ns.random_challenge[0].decline(ns.player)
-            ns.random_challenge = ns.__random_challenge()
-            return ns.check_win_lose_state()
+    def apply_decline(self, op: 'Operator'):
+        # Declining costs the same whatever the offer is, so an offer that was never read is never drawn from its seed
+        ns = ChallengeMenuState(old=self)
+        Challenge.decline(ns.player)
+        ns.new_offer()
+        return ns.check_win_lose_state()
 
-    def describe_state(self) -> str:
+    transitions = {**State.transitions,
+                   OperatorIds.CHALLENGE_ACCEPT: apply_accept,
+                   OperatorIds.CHALLENGE_DECLINE: apply_decline}
+
+    def progress_key(self) -> tuple:
+        # The offer is what offer_seed draws at the player's level, so keying never draws it, and the key stays the same
+        # once it is drawn. An offer taken from a pool does not follow from the seed and is keyed by its content.
+        key = self.offer_seed, self.player.difficulty_level
+        return key + (self._offer[0].key(),) if self._pooled else key
+
+    def format_description(self) -> str:
         return f"You have a challenge available: {self.random_challenge[0].preview()}."
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
 
 class ChallengeState(State):
+    op_ids = frozenset((OperatorIds.CHALLENGE_CANCEL,))
+
+    __slots__ = ()
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return op.id is OperatorIds.CHALLENGE_CANCEL
+    def apply_cancel(self, op: 'Operator'):
+        ns = ChallengeMenuState(self)
+        ns.player.current_challenge.cancel(ns.player)
+        ns.remove_challenge()
+        return ns
 
-    def apply_operator(self, op: 'Operator'):
-        if op.id is OperatorIds.CHALLENGE_CANCEL:
-            ns = ChallengeMenuState(self)
-            ns.player.current_challenge.cancel(ns.player)
-            ns.remove_challenge()
-            return ns
+    # The handlers of the challenge's own operators are registered through Challenges.all
+    transitions = {OperatorIds.CHALLENGE_CANCEL: apply_cancel}
+
+
+class Message(NamedTuple):
+    title: str
+    info: str
+    show_title: bool = True
+    goal: bool = False  # Shown for reaching the goal, see State.set_goal_state()
 
 
 class MessageDisplayState(State):
-    def __init__(self, continue_to: 'State' = None, title: str = None, info: str = None, show_title: bool = True, old: 'State' = None):
-        super().__init__(old)
-        self.continue_to = continue_to
-        self.title = title
-        self.info = info
-        self.show_title = show_title
+    """Shows the queue of messages before the target state, one per MENU_CONTINUE. The messages are plain records,
+    and every state of the queue shares the player, challenge, round and seed of the target instead of cloning them,
+    but for the goal message: goal_test marks the player of a goal state as finished, so it gets its own player."""
+
+    op_ids = frozenset((OperatorIds.MENU_CONTINUE,))
+
+    __slots__ = ("target", "messages")
+
+    def __init__(self, target: 'State' = None, messages: 'tuple' = (), old: 'State' = None):
+        if isinstance(old, MessageDisplayState):
+            target, messages = old.target, old.messages
+        self.target = target
+        self.messages = messages
+        self.player = PlayerInfo.clone(target.player) if messages[0].goal else target.player
+        self.challenge = target.challenge
+        self.round = target.round
+        self.seed = target.seed
+        self.selected_operator = None
+        self.is_goal_state = messages[0].goal
+        self._applicable_op_ids = None
+        self._description = None
+        self._text = None
+
+    @property
+    def title(self) -> str:
+        return self.messages[0].title
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return op.id is OperatorIds.MENU_CONTINUE
+    @property
+    def info(self) -> str:
+        return self.messages[0].info
+
+    @property
+    def show_title(self) -> bool:
+        return self.messages[0].show_title
+
+    @property
+    def continue_to(self) -> 'State':
+        return MessageDisplayState(self.target, self.messages[1:]) if len(self.messages) > 1 else self.target
 
     def apply_operator(self, op: 'Operator'):
         self.store_operator(op)
         return self.continue_to
 
-    def describe_state(self) -> str:
+    def set_goal_state(self):
+        self.messages = (self.messages[0]._replace(goal=True),) + self.messages[1:]
+        if not self.is_goal_state:
+            self.player = PlayerInfo.clone(self.target.player)
+        self.is_goal_state = True
+        return self
+
+    def format_description(self) -> str:
         if self.show_title:
             return f"{self.title}\n{self.info}"
         else:
             return self.info
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
+
+    def progress_key(self) -> tuple:
+        return self.messages, self.target.key()
 
     def before(self, title: str = None, info: str = None, show_title: bool = True):
-        return MessageDisplayState.show_message(self, title, info, show_title)
+        # The queue with one more message in front
+        return MessageDisplayState(self.target, (Message(title, info, show_title),) + self.messages)
 
     @staticmethod
-    def show_message(continue_to: 'State', title: str = None, info: str = None, show_title: bool = True, old: 'State' = None):
-        return MessageDisplayState(continue_to, title, info, show_title, old=old if old else continue_to)
+    def show_message(continue_to: 'State', title: str = None, info: str = None, show_title: bool = True):
+        # A message shown before continue_to, or before the messages continue_to already shows
+        if isinstance(continue_to, MessageDisplayState):
+            return continue_to.before(title, info, show_title)
+        return MessageDisplayState(continue_to, (Message(title, info, show_title),))
+
+
+class ContentPool:
+    """An immutable pool of interned content entries. Challenges only hold the integer id (index) of an entry;
+    the category of every entry is precomputed in a tuple parallel to the entries, and the entries cache their hash."""
+
+    __slots__ = ("entries", "categories", "ids_by_category")
+
+    def __init__(self, entries, category_of=None):
+        self.entries = tuple(dict.fromkeys(entries))  # Duplicated entries are only kept once
+        self.categories = tuple(category_of(e) for e in self.entries) if category_of else (None,) * len(self.entries)
+        ids_by_category = {}
+        for ind, category in enumerate(self.categories):
+            ids_by_category.setdefault(category, []).append(ind)
+        self.ids_by_category = {category: tuple(ids) for category, ids in ids_by_category.items()}
+
+    def sample(self, k: int, rng: 'Random' = None) -> 'List[int]':
+        # k distinct ids drawn uniformly in O(k), independently of the size of the pool
+        if k > len(self):
+            raise ValueError(f"Cannot draw {k} distinct entries from a pool of {len(self)}")
+        return (rng or Random()).sample(range(len(self)), k)
+
+    def sample_balanced(self, k: int, categories=None, rng: 'Random' = None) -> 'List[int]':
+        # k distinct ids spread as evenly as possible over the given categories (all of them by default)
+        rng = rng or Random()
+        categories = list(self.ids_by_category if categories is None else categories)
+        rng.shuffle(categories)  # Decides which categories get one more entry when k is not a multiple of their number
+        categories.sort(key=lambda category: len(self.ids_by_category.get(category, ())))
+        ids, remaining = [], k
+        for ind, category in enumerate(categories):
+            pool = self.ids_by_category.get(category, ())
+            take = min(len(pool), remaining // (len(categories) - ind))
+            ids += rng.sample(pool, take)
+            remaining -= take
+        if remaining > 0:
+            raise ValueError(f"Cannot draw {k} distinct entries from {len(categories)} categories holding {k - remaining} entries")
+        rng.shuffle(ids)
+        return ids
+
+    def __getitem__(self, ind: int):
+        return self.entries[ind]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+def cached_table(name: str, build):
+    # build(), or the table it built at the last launch when the module is loaded by SOLUZION_Loader.py
+    cache = globals().get("TABLE_CACHE")
+    return cache.get(name, build) if cache is not None else build()
+
+
+# SQLite file of the content pools, used instead of the literals below when it exists (see InfoFlow_Content.py)
+CONTENT_STORE = os.environ.get("INFOFLOW_CONTENT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "InfoFlow_Content.sqlite"))
+
+
+class CategoryIndex:
+    """The categories of the ids of a ContentStore, whose entries are stored category by category: each category
+    is a range of ids, so the category of an id is found by bisection over the first id of every category."""
+
+    __slots__ = ("firsts", "names", "size")
+
+    def __init__(self, ranges, size: int):
+        # ranges: (category, first id, count) in the order of the ids
+        self.firsts = [first for _, first, _ in ranges]
+        self.names = [category for category, _, _ in ranges]
+        self.size = size
+
+    def __getitem__(self, ind: int):
+        if not 0 <= ind < self.size:
+            raise IndexError(ind)
+        return self.names[bisect_right(self.firsts, ind) - 1]
+
+    def __len__(self):
+        return self.size
+
+
+class ContentStore(ContentPool):
+    """A content pool read from an SQLite file instead of held in memory: only the size and the id range of every
+    category are loaded, and an entry is read (and decoded from its JSON arguments) when a challenge asks for it,
+    so the startup time and memory do not grow with the corpus. Recently read entries are cached.
+
+    Tables: pools(pool, size, version), categories(pool, category, first, count) with the category as JSON,
+    entries(pool, id, data) with data the JSON arguments of the entry, ids 0 .. size - 1 of each pool."""
+
+    version = 1
+    cache_size = 4096
+
+    __slots__ = ("path", "pool", "decode", "size", "cache", "lock", "_connection", "_pid")
+
+    def __init__(self, path: str, pool: str, decode, size: int, ranges):
+        self.path = path
+        self.pool = pool
+        self.decode = decode
+        self.size = size
+        self.categories = CategoryIndex(ranges, size)
+        self.ids_by_category = {category: range(first, first + count) for category, first, count in ranges}
+        self.cache = {}
+        self.lock = Lock()  # The connection is shared with other threads, e.g. an AutoPlayer
+        self._connection = None
+        self._pid = None
+
+    @staticmethod
+    def connect(path: str) -> 'sqlite3.Connection':
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    @staticmethod
+    def load(pool: str, decode, path: str = None) -> 'ContentStore':
+        # The pool stored in the file, None if there is no such file or pool, so that the literals are used instead
+        path = CONTENT_STORE if path is None else path
+        if not path or not os.path.exists(path):
+            return None
+        connection = ContentStore.connect(path)
+        try:
+            row = connection.execute("SELECT size, version FROM pools WHERE pool = ?", (pool,)).fetchone()
+            if row is None or row[1] != ContentStore.version:
+                return None
+            ranges = [(json.loads(category), first, count) for category, first, count in connection.execute(
+                "SELECT category, first, count FROM categories WHERE pool = ? ORDER BY first", (pool,))]
+        finally:
+            connection.close()
+        return ContentStore(path, pool, decode, row[0], ranges)
+
+    def connection(self) -> 'sqlite3.Connection':
+        # One connection per process, a connection must not be used in a process forked after it was opened
+        if self._pid != os.getpid():
+            self._connection, self._pid = ContentStore.connect(self.path), os.getpid()
+        return self._connection
+
+    def __getitem__(self, ind: int):
+        entry = self.cache.get(ind)
+        if entry is None:
+            if not 0 <= ind < self.size:
+                raise IndexError(ind)
+            with self.lock:
+                data, = self.connection().execute("SELECT data FROM entries WHERE pool = ? AND id = ?", (self.pool, ind)).fetchone()
+            entry = self.decode(json.loads(data))
+            if len(self.cache) >= ContentStore.cache_size:
+                del self.cache[next(iter(self.cache))]
+            self.cache[ind] = entry
+        return entry
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        with self.lock:
+            rows = self.connection().execute("SELECT data FROM entries WHERE pool = ? ORDER BY id", (self.pool,)).fetchall()
+        return (self.decode(json.loads(data)) for data, in rows)
+
+    @staticmethod
+    def write(path: str, pools) -> None:
+        # pools: {pool: (entries, category of an entry, JSON arguments of an entry)}. The entries are stored
+        # category by category, in the order of their first entry, and replace the whole file.
+        temporary = f"{path}.tmp"
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        connection = sqlite3.connect(temporary)
+        with connection:
+            connection.execute("CREATE TABLE pools (pool TEXT PRIMARY KEY, size INTEGER, version INTEGER)")
+            connection.execute("CREATE TABLE categories (pool TEXT, category TEXT, first INTEGER, count INTEGER, PRIMARY KEY (pool, first))")
+            connection.execute("CREATE TABLE entries (pool TEXT, id INTEGER, data TEXT, PRIMARY KEY (pool, id)) WITHOUT ROWID")
+            for pool, (entries, category_of, encode) in pools.items():
+                by_category = {}
+                for entry in dict.fromkeys(entries):
+                    by_category.setdefault(category_of(entry), []).append(entry)
+                first = 0
+                for category, group in by_category.items():
+                    connection.execute("INSERT INTO categories VALUES (?, ?, ?, ?)", (pool, json.dumps(category), first, len(group)))
+                    connection.executemany("INSERT INTO entries VALUES (?, ?, ?)",
+                                           ((pool, first + ind, json.dumps(encode(entry))) for ind, entry in enumerate(group)))
+                    first += len(group)
+                connection.execute("INSERT INTO pools VALUES (?, ?, ?)", (pool, first, ContentStore.version))
+        connection.close()
+        os.replace(temporary, path)
 
 
 class NewsInformation:
     all_categories = ("Business", "Music & Arts", "Health & Medicine", "Nature & Environments", "Politics",
                       "Religion", "Science", "Sports", "Video Games")
 
+    __slots__ = ("category", "content", "_hash")
+
     def __init__(self, category: str, content: str):
         self.category = category
         self.content = content
+        self._hash = hash((category, content))
 
     def __eq__(self, other):
         if other is None:
@@ -457,15 +844,18 @@ class NewsInformation:
         return isinstance(other, type(self)) and self.category == other.category and self.content == other.content
 
     def __hash__(self):
-        return hash(f"{self.category}:{self.content}")
+        return self._hash
 
     def __str__(self):
         return self.content
 
+    def __reduce__(self):
+        return NewsInformation, (self.category, self.content)
+
 
 class NewsSortingChallenge(Challenge):
     provided_ops = list([Operator(f"In category '{cat}'", cat) for cat in NewsInformation.all_categories])
-    news_collection = [
+    news_collection = ContentStore.load("news", lambda args: NewsInformation(*args)) or cached_table("news", lambda: ContentPool([
         *[NewsInformation("Business", content)
           for content in ["Trump says he's ready to hit China with another $267 billion in tariffs",
                           "Kudlow: Job gains, wage growth show Trump's 'economic boom continues'",
@@ -566,32 +956,39 @@ class NewsSortingChallenge(Challenge):
                           "For the first time ever, WoW's top guild will stream its race to beat the brutal new raid",
                           "Rainbow Six Siege game director talks Castle and Thatcher balance reworks",
                           "China takes down Korea to win the 2018 Asian Games"]]
-    ]
+    ], lambda info: info.category))
 
     score_correct_info = 10
     score_incorrect_info = -20
 
-    def __init__(self, level: int, to_sort: List[NewsInformation], categories: List[str] = None, sorted: Dict[str, List[NewsInformation]] = None):
+    __slots__ = ("to_sort", "categories", "sorted")
+
+    def __init__(self, level: int, to_sort: 'List[int]', categories: List[str] = None, sorted: 'Dict[str, List[int]]' = None):
         super().__init__("News Sorting Challenge", level)
+        # Stores ids in NewsSortingChallenge.news_collection
         self.to_sort = to_sort
-        self.categories = deepcopy(categories) if categories else list(set([info.category for info in to_sort]))
-        self.categories.sort()
-        self.sorted = sorted if deepcopy(sorted) else {}
+        if not categories:
+            categories = list(set([NewsSortingChallenge.news_collection.categories[info] for info in to_sort]))
+            categories.sort()
+        self.categories = categories
+        self.sorted = sorted if sorted else {}
 
-    def sort_to(self, info: 'NewsInformation', category: 'str'):
-        self.sorted.setdefault(category, list())
-        self.sorted[category].append(info)
+    def news(self, index: int) -> 'NewsInformation':
+        return NewsSortingChallenge.news_collection[self.to_sort[index]]
 
-    def remove_from(self, info: 'NewsInformation', category: 'str'):
-        if category in self.to_sort and info in self.to_sort[category]:
-            self.to_sort[category].remove(info)
+    def sort_to(self, info: int, category: 'str'):
+        self.sorted = {**self.sorted, category: self.sorted.get(category, []) + [info]}
+
+    def remove_from(self, info: int, category: 'str'):
+        if category in self.sorted and info in self.sorted[category]:
+            self.sorted = {**self.sorted, category: [i for i in self.sorted[category] if i != info]}
 
     def submit(self, p: 'PlayerInfo'):
         correct = 0
         for cat, infos in self.sorted.items():
             for info in infos:
                 p.add_info_got(1)
-                if info.category == cat:
+                if NewsSortingChallenge.news_collection.categories[info] == cat:
                     p.score += NewsSortingChallenge.score_correct_info
                     correct += 1
                 else:
@@ -606,32 +1003,35 @@ class NewsSortingChallenge(Challenge):
 
     def __str__(self):
         return (f"{super().__str__()}\tChallenge Level: {self.level}\n"
-                "\n".join([f"\t{'{0:3}'.format(ind)}: {info.content}" for ind, info in enumerate(self.to_sort)]))
+                "\n".join([f"\t{'{0:3}'.format(ind)}: {self.news(ind).content}" for ind in range(len(self.to_sort))]))
+
+    def key(self) -> tuple:
+        return super().key() + (tuple(self.to_sort), tuple((cat, tuple(infos)) for cat, infos in self.sorted.items()))
 
     def clone(self) -> 'NewsSortingChallenge':
-        return NewsSortingChallenge(self.level, deepcopy(self.to_sort), deepcopy(self.categories), deepcopy(self.sorted))
+        return NewsSortingChallenge(self.level, self.to_sort, self.categories, self.sorted)
 
     @staticmethod
-    def random(level) -> 'NewsSortingChallenge':
+    def random(level, rng: 'Random' = None, balanced: bool = False) -> 'NewsSortingChallenge':
         count = round(level ** 1.5) + 5 if not Debug.debug else 1
-        to_sort = set()
-        while len(to_sort) < count:
-            to_sort.add(choice(NewsSortingChallenge.news_collection))
-        return NewsSortingChallenge(level, list(to_sort))
+        pool = NewsSortingChallenge.news_collection
+        return NewsSortingChallenge(level, pool.sample_balanced(count, rng=rng) if balanced else pool.sample(count, rng))
 
 
 class NewsSortingChallengeState(ChallengeState):
+    __slots__ = ("news_index",)
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
         self.news_index = old.news_index + 1 if old and isinstance(old, NewsSortingChallengeState) else 0
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return super().is_applicable_operator(op) or op.id in self.player.current_challenge.categories
+    def dynamic_op_ids(self):
+        return self.player.current_challenge.categories
 
-    def apply_operator(self, op: 'Operator'):
-        self.store_operator(op)
-        if super().is_applicable_operator(op):
-            return super().apply_operator(op)
+    def suggested_op_id(self, node_budget: int = 20000):
+        return NewsSortingChallenge.news_collection.categories[self.player.current_challenge.to_sort[self.news_index]]
+
+    def apply_sort(self, op: 'Operator'):
         if self.news_index + 1 < len(self.player.current_challenge.to_sort):
             ns = NewsSortingChallengeState(self)
             ns.player.current_challenge.sort_to(self.player.current_challenge.to_sort[self.news_index], op.id)
@@ -652,18 +1052,24 @@ This challenge is a representation of 'Variety' in Big Data."""
                 return (MessageDisplayState.show_message(ns, "", philosophy, False)
                         .before("Nice try!", f"You only have a {int(corr * 100)}% completion."))
 
-    def describe_state(self) -> str:
-        return (f"News: {self.player.current_challenge.to_sort[self.news_index]}"
+    def progress_key(self) -> tuple:
+        return self.news_index,
+
+    def format_description(self) -> str:
+        return (f"News: {self.player.current_challenge.news(self.news_index)}"
                 f"\t(News sorted: {self.news_index}/{len(self.player.current_challenge.to_sort)})\nWhich category should this news belong to?")
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
 
 class Myth:
+    __slots__ = ("content", "is_fact", "_hash")
+
     def __init__(self, content: str, is_fact: bool):
         self.content = content
         self.is_fact = is_fact
+        self._hash = hash((content, is_fact))
 
     def __eq__(self, other):
         if other is None:
@@ -671,15 +1077,18 @@ class Myth:
         return isinstance(other, type(self)) and self.content == other.content and self.is_fact == other.is_fact
 
     def __hash__(self):
-        return hash(f"{self.content}:{self.is_fact}")
+        return self._hash
 
     def __str__(self):
         return self.content
 
+    def __reduce__(self):
+        return Myth, (self.content, self.is_fact)
+
 
 class MythBusterChallenge(Challenge):
     provided_ops = [Operator("Is a Fact", "MYTHBUSTER_FACT"), Operator("Is a Myth", "MYTHBUSTER_MYTH")]
-    all_myths = [
+    all_myths = ContentStore.load("myths", lambda args: Myth(*args)) or cached_table("myths", lambda: ContentPool([
         Myth("Glass Is a Slow-moving Liquid.", False),
         Myth("Deoxygenated Blood Is Blue.", False),
         Myth("Glass Is a Slow-moving Liquid.", False),
@@ -799,27 +1208,36 @@ class MythBusterChallenge(Challenge):
         Myth("You are 1% shorter in the evening than in the morning", True),
         Myth("The elephant is the only mammal that can’t jump!", True),
         Myth("Most dust particles in your house are made from dead skin!", True)
-    ]
+    ], lambda myth: myth.is_fact))
 
     level_correct_required = [.66, .72, .78, .84, .9]
     score_correct_guess = 10
     score_incorrect_guess = -20
 
-    def __init__(self, level: int, myths: 'List[Myth]', guesses: 'Dict[Myth, bool]'):
+    __slots__ = ("myths", "guesses")
+
+    def __init__(self, level: int, myths: 'List[int]', guesses: 'Dict[int, bool]'):
         super().__init__("Myth Buster Challenge", level)
+        # Stores ids in MythBusterChallenge.all_myths
         self.myths = myths
         # Guess = True if the player think it is a fact; otherwise, should be False
         self.guesses = guesses
 
-    def guess(self, myth: 'Myth', guess: bool):
-        self.guesses[myth] = guess
-        return myth.is_fact == guess
+    def myth(self, index: int) -> 'Myth':
+        return MythBusterChallenge.all_myths[self.myths[index]]
+
+    def is_fact(self, index: int) -> bool:
+        return MythBusterChallenge.all_myths.categories[self.myths[index]]
+
+    def guess(self, myth: int, guess: bool):
+        self.guesses = {**self.guesses, myth: guess}
+        return MythBusterChallenge.all_myths.categories[myth] == guess
 
     def submit(self, p: 'PlayerInfo'):
         correct = 0
         for myth, guess in self.guesses.items():
             p.add_info_got(1)
-            if myth.is_fact == guess:
+            if MythBusterChallenge.all_myths.categories[myth] == guess:
                 correct += 1
         correct_level = correct / len(self.myths)
         if correct_level >= self.level_correct_required[self.level]:  # Require at least a specific amount of the information are sorted correctly to get success in this challenge
@@ -829,40 +1247,41 @@ class MythBusterChallenge(Challenge):
             self.set_unfinished(p, correct_level)
             return False, correct_level
 
+    def key(self) -> tuple:
+        return super().key() + (tuple(self.myths), tuple(self.guesses.items()))
+
     def clone(self):
-        return MythBusterChallenge(self.level, deepcopy(self.myths), deepcopy(self.guesses))
+        return MythBusterChallenge(self.level, self.myths, self.guesses)
 
     @staticmethod
-    def random(level):
+    def random(level, rng: 'Random' = None):
         count = level + 5 if not Debug.debug else 1
-        myths = set()
-        while len(myths) < count:
-            myths.add(choice(MythBusterChallenge.all_myths))
-        return MythBusterChallenge(level, list(myths), {})
+        return MythBusterChallenge(level, MythBusterChallenge.all_myths.sample(count, rng), {})
 
 
 class MythBusterChallengeState(ChallengeState):
+    op_ids = ChallengeState.op_ids.union(op.id for op in MythBusterChallenge.provided_ops)
+
+    __slots__ = ("myth_index",)
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
         self.myth_index = old.myth_index + 1 if old and isinstance(old, MythBusterChallengeState) else 0
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return super().is_applicable_operator(op) or op in MythBusterChallenge.provided_ops
+    def suggested_op_id(self, node_budget: int = 20000):
+        return MythBusterChallenge.provided_ops[0 if self.player.current_challenge.is_fact(self.myth_index) else 1].id
 
-    def apply_operator(self, op: 'Operator'):
-        self.store_operator(op)
-        if super().is_applicable_operator(op):
-            return super().apply_operator(op)
+    def apply_guess(self, op: 'Operator'):
         if self.myth_index + 1 < len(self.player.current_challenge.myths):
             ns = MythBusterChallengeState(self)
             ret = ns.player.current_challenge.guess(self.player.current_challenge.myths[self.myth_index], op.id is MythBusterChallenge.provided_ops[0].id)
-            info = "It is a truth!" if self.player.current_challenge.myths[self.myth_index].is_fact else "It is a myth!"
+            info = "It is a truth!" if self.player.current_challenge.is_fact(self.myth_index) else "It is a myth!"
             ns.player.score += MythBusterChallenge.score_correct_guess if ret else MythBusterChallenge.score_incorrect_guess
             return MessageDisplayState.show_message(ns, "Correct!" if ret else "Incorrect!", info)
         else:
             ns = ChallengeMenuState(self)
             ret = ns.player.current_challenge.guess(self.player.current_challenge.myths[self.myth_index], op.id is MythBusterChallenge.provided_ops[0].id)
-            info = "It is a truth!" if self.player.current_challenge.myths[self.myth_index].is_fact else "It is a myth!"
+            info = "It is a truth!" if self.player.current_challenge.is_fact(self.myth_index) else "It is a myth!"
             philosophy = """It is hard to identify all those myths, right? I cannot believe some of them are myths when I found them on the internet, neither. 
 Actually, maybe you did not realize, we are surrounded by fake news and information. 
 This challenge is a representation of ‘Veracity’ in Big Data."""
@@ -877,17 +1296,20 @@ This challenge is a representation of ‘Veracity’ in Big Data."""
                         .before("Nice try!", f"You only have a {int(corr * 100)}% completion.")
                         .before("Correct!" if ret else "Incorrect!", info))
 
-    def describe_state(self) -> str:
-        return (f"Myth's Content: {self.player.current_challenge.myths[self.myth_index]}"
+    def progress_key(self) -> tuple:
+        return self.myth_index,
+
+    def format_description(self) -> str:
+        return (f"Myth's Content: {self.player.current_challenge.myth(self.myth_index)}"
                 f"\t(Myth Guessed: {self.myth_index}/{len(self.player.current_challenge.myths)})\nFACT or MYTH?")
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
 
 class InstantMemChallenge(Challenge):
     provided_ops = list([Operator("First", "INSTANTMEM_FIRST"), Operator("Second", "INSTANTMEM_SECOND"), Operator("Third", "INSTANTMEM_THIRD")])
-    all_sentences = [
+    all_sentences = ContentStore.load("sentences", tuple) or cached_table("sentences", lambda: ContentPool(tuple(group) for group in [
         ["A woman weighs the positive and negative aspects of accepting a new job.",
          "A woman does not correct a stranger who mistakes her for someone else",
          "A woman impersonates someone else to seek revenge on an acquaintance."],
@@ -948,12 +1370,14 @@ class InstantMemChallenge(Challenge):
         ["The North Pole is farther away than the cities usually reached by train.",
          "People often travel from one city to another without considering the implications.",
          "Reaching the North Pole has no foreseeable benefit to humanity."]
-    ]
+    ]))
 
     score_correct_sentences = 10
     score_incorrect_sentences = -20
     level_correct_required = [.75, .5, .85, .9, .95]
 
+    __slots__ = ("sentences", "to_remember", "remembered")
+
     def __init__(self, level: int, sentences: 'Dict[int, (int, int)]', to_remember: 'List[int]', remembered: 'Dict[int]'):
         super().__init__("InstantMem Challenge", level)
         #  Stores {Index from 0 : (Index in InstantMemChallenge.all_sentences, Which one to remember)}
@@ -963,6 +1387,9 @@ class InstantMemChallenge(Challenge):
         # Stores {Index from 0 : Selected choices}
         self.remembered = remembered
 
+    def remember(self, index: int, choice: int):
+        self.remembered = {**self.remembered, index: choice}
+
     def submit(self, p: 'PlayerInfo'):
         correct = 0
         for i in range(len(self.remembered)):
@@ -980,27 +1407,28 @@ class InstantMemChallenge(Challenge):
             self.set_unfinished(p, correct_level)
             return False, correct_level
 
+    def key(self) -> tuple:
+        return super().key() + (tuple(self.sentences.items()), tuple(self.to_remember), tuple(self.remembered.items()))
+
     def clone(self):
-        return InstantMemChallenge(self.level, deepcopy(self.sentences), deepcopy(self.to_remember), deepcopy(self.remembered))
+        return InstantMemChallenge(self.level, self.sentences, self.to_remember, self.remembered)
 
     @staticmethod
-    def random(level: int) -> "InstantMemChallenge":
+    def random(level: int, rng: 'Random' = None) -> "InstantMemChallenge":
+        rng = rng or Random()
         count = (level + 2) * 2 if not Debug.debug else 1
         count_tr = level + 1 if not Debug.debug else 1
-        sentence_set, sentences, to_remember = set(), {}, []
-        c = 0
-        while len(sentence_set) < count:
-            r = randrange(0, len(InstantMemChallenge.all_sentences))
-            if r not in sentence_set:
-                sentence_set.add(r)
-                sentences[c] = (r, randrange(0, 3))
-                c += 1
-                if len(to_remember) < count_tr:
-                    to_remember.append(c)
+        sentences = {c: (r, rng.randrange(0, 3)) for c, r in enumerate(InstantMemChallenge.all_sentences.sample(count, rng))}
+        to_remember = list(range(1, min(count, count_tr) + 1))
         return InstantMemChallenge(level, sentences, to_remember, {})
 
 
 class InstantMemChallengeState(ChallengeState):
+    phase_op_ids = ((OperatorIds.MENU_CONTINUE,), tuple(op.id for op in InstantMemChallenge.provided_ops))
+    choices = {op.id: ind for ind, op in enumerate(InstantMemChallenge.provided_ops)}
+
+    __slots__ = ("phase_index", "instant_mem_index")
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
         if old and isinstance(old, InstantMemChallengeState):
@@ -1010,52 +1438,50 @@ class InstantMemChallengeState(ChallengeState):
             self.phase_index = 0
             self.instant_mem_index = 0
 
-    def is_applicable_operator(self, op: 'Operator'):
-        return (super().is_applicable_operator(op)
-                or (self.phase_index is 0 and op.id is OperatorIds.MENU_CONTINUE)
-                or (self.phase_index is 1 and op in InstantMemChallenge.provided_ops))
+    def dynamic_op_ids(self):
+        return InstantMemChallengeState.phase_op_ids[self.phase_index]
 
-    def apply_operator(self, op: 'Operator'):
-        self.store_operator(op)
-        if super().is_applicable_operator(op):
-            return super().apply_operator(op)
-        if self.phase_index is 0:
+    def suggested_op_id(self, node_budget: int = 20000):
+        if self.phase_index == 1:
+            return InstantMemChallenge.provided_ops[self.player.current_challenge.sentences[self.instant_mem_index][1]].id
+        return OperatorIds.MENU_CONTINUE
+
+    def apply_memorize(self, op: 'Operator'):
+        ns = InstantMemChallengeState(self)
+        if ns.instant_mem_index == len(ns.player.current_challenge.sentences):
+            ns.phase_index = 1
+            ns.instant_mem_index = 0
+            return MessageDisplayState.show_message(ns, "Warning~", "Now is the time to test your memorizations. Hope you still remember these information!")
+        else:
+            return ns
+
+    def apply_recall(self, op: 'Operator'):
+        if self.instant_mem_index + 1 < len(self.player.current_challenge.to_remember):
             ns = InstantMemChallengeState(self)
-            if ns.instant_mem_index == len(ns.player.current_challenge.sentences):
-                ns.phase_index = 1
-                ns.instant_mem_index = 0
-                return MessageDisplayState.show_message(ns, "Warning~", "Now is the time to test your memorizations. Hope you still remember these information!")
-            else:
-                return ns
-        elif self.phase_index is 1:
-            if self.instant_mem_index + 1 < len(self.player.current_challenge.to_remember):
-                ns = InstantMemChallengeState(self)
-                ns.player.current_challenge.remembered[self.instant_mem_index] = (
-                    0 if op.id is InstantMemChallenge.provided_ops[0]
-                    else 1 if op.id is InstantMemChallenge.provided_ops[1]
-                    else 2 if op.id is InstantMemChallenge.provided_ops[2]
-                    else -1)
-                return ns
-            else:
-                ns = ChallengeMenuState(self)
-                ns.player.current_challenge.remembered[self.instant_mem_index] = (
-                    0 if op.id is InstantMemChallenge.provided_ops[0].id
-                    else 1 if op.id is InstantMemChallenge.provided_ops[1].id
-                    else 2 if op.id is InstantMemChallenge.provided_ops[2].id
-                    else -1)
-                philosophy = """In fact, all those statements are from the Official Guide of SAT test. So you can relax because you won't see things like this in your daily life ^^.
+            ns.player.current_challenge.remember(self.instant_mem_index, InstantMemChallengeState.choices[op.id])
+            return ns
+        else:
+            ns = ChallengeMenuState(self)
+            ns.player.current_challenge.remember(self.instant_mem_index, InstantMemChallengeState.choices[op.id])
+            philosophy = """In fact, all those statements are from the Official Guide of SAT test. So you can relax because you won't see things like this in your daily life ^^.
 But it is still a miniature of all information we receive. Just imagine, we are exposed to approximately 34 gigabytes of information while most of them are spam.
 This challenge is a representation of 'Volume' in Big Data."""
-                passed, corr = ns.player.current_challenge.submit(ns.player)
-                ns.remove_challenge()
-                if passed:
-                    return (MessageDisplayState.show_message(ns, "", philosophy, False)
-                            .before("Great job!", f"You solved the challenge with a {int(corr * 100)}% completion!"))
-                else:
-                    return (MessageDisplayState.show_message(ns, "", philosophy, False)
-                            .before("Nice try!", f"You only have a {int(corr * 100)}% completion."))
+            passed, corr = ns.player.current_challenge.submit(ns.player)
+            ns.remove_challenge()
+            if passed:
+                return (MessageDisplayState.show_message(ns, "", philosophy, False)
+                        .before("Great job!", f"You solved the challenge with a {int(corr * 100)}% completion!"))
+            else:
+                return (MessageDisplayState.show_message(ns, "", philosophy, False)
+                        .before("Nice try!", f"You only have a {int(corr * 100)}% completion."))
+
+    transitions = {**ChallengeState.transitions,
+                   OperatorIds.MENU_CONTINUE: apply_memorize}
+
+    def progress_key(self) -> tuple:
+        return self.phase_index, self.instant_mem_index
 
-    def describe_state(self):
+    def format_description(self):
         s = self.player.current_challenge.sentences[self.instant_mem_index]
         if self.phase_index is 0:
             return f"Memorize this information:\n    {InstantMemChallenge.all_sentences[s[0]][s[1]]}"
@@ -1063,14 +1489,31 @@ This challenge is a representation of 'Volume' in Big Data."""
             choices = ''.join([f'\n    {InstantMemChallenge.provided_ops[ind].name}: {s}' for ind, s in enumerate(self.player.current_challenge.all_sentences[s[0]])])
             return f"Which was shown before in Memorization #{self.instant_mem_index}:\n{choices}"
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
 
 class MinerChallenge(Challenge):
     provided_ops = [Operator("Go North", "MINER_NORTH"), Operator("Go South", "MINER_SOUTH"), Operator("Go East", "MINER_EAST"), Operator("Go West", "MINER_WEST")]
+    offsets = ((0, -1), (0, 1), (1, 0), (-1, 0))  # Offsets of provided_ops
+
+    # Cells of the map, one byte each
+    BLANK, USELESS, USEFUL, PLAYER, DESTINATION = 0, 1, 2, 4, 5
+    # Byte value of a random draw -> cell, 40% blank, 40% useless and 20% useful info (to within 1/256)
+    cell_of_byte = bytes([BLANK] * 103 + [USELESS] * 102 + [USEFUL] * 51)
+
+    # Points of the submit score for stepping onto a cell, by cell, and for every step
+    points_of_cell = (0, -15, 30, 0, 0, 0)
+    points_of_step = -3
 
-    def __init__(self, level: int, map, map_size, x, y, useful_info_collected: int, useless_info_collected: int, steps: int):
+    # (map, map_size, x, y) -> MinerRoute found from there, the oldest is evicted first beyond max_routes
+    routes = {}
+    max_routes = 4096
+
+    __slots__ = ("map_size", "x", "y", "map", "useful_info_collected", "useless_info_collected", "steps", "row_texts")
+
+    def __init__(self, level: int, map: bytes, map_size, x, y, useful_info_collected: int, useless_info_collected: int, steps: int,
+                 row_texts: tuple = None):
         super().__init__("Miner Challenge", level)
         self.map_size = map_size
         self.x, self.y = x, y
@@ -1078,11 +1521,16 @@ class MinerChallenge(Challenge):
         self.useful_info_collected = useful_info_collected
         self.useless_info_collected = useless_info_collected
         self.steps = steps
+        self.row_texts = row_texts  # Text of every row of the map without the player, made by grid_text(), shared with the clones
 
-    def submit(self, p: 'PlayerInfo'):
+    def partial_score(self) -> int:
         score = self.useful_info_collected * 2 - self.useless_info_collected
         score *= 15
         score -= self.steps * 3
+        return score
+
+    def submit(self, p: 'PlayerInfo'):
+        score = self.partial_score()
         p.score += score
         if score > 0:
             self.set_finished(p)
@@ -1097,59 +1545,129 @@ class MinerChallenge(Challenge):
         if self.can_move(off_x, off_y):
             self.x += off_x
             self.y += off_y
-            info = self.map[self.y][self.x]
-            if info is 2:
+            index = self.y * self.map_size + self.x
+            info = self.map[index]
+            if info == MinerChallenge.USEFUL:
                 self.useful_info_collected += 1
-            elif info is 1:
+            elif info == MinerChallenge.USELESS:
                 self.useless_info_collected += 1
-            self.map[self.y][self.x] = 0
+            if info != MinerChallenge.BLANK:
+                # The map is immutable bytes shared with the clones, a collected cell costs one copy of map_size² bytes
+                self.map = self.map[:index] + b"\0" + self.map[index + 1:]
+                if self.row_texts is not None:
+                    self.row_texts = self.row_texts[:self.y] + (self.row_text(self.y),) + self.row_texts[self.y + 1:]
             self.steps += 1
 
     def is_at_dest(self):
         return self.y + 1 == self.map_size and self.x + 1 == self.map_size
 
+    def cell(self, x: int, y: int) -> int:
+        return self.map[y * self.map_size + x]
+
+    def row_text(self, y: int, x: int = None) -> str:
+        # "[c, c, ...]" of row y, with the player in column x
+        cells = [str(info) for info in self.map[y * self.map_size:(y + 1) * self.map_size]]
+        if x is not None:
+            cells[x] = str(MinerChallenge.PLAYER)
+        return f"[{', '.join(cells)}]"
+
+    def grid_text(self) -> str:
+        # Only the rows whose cells changed since the last call are formatted again, a move changes at most two
+        if self.row_texts is None:
+            self.row_texts = tuple(self.row_text(y) for y in range(self.map_size))
+        rows = list(self.row_texts)
+        rows[self.y] = self.row_text(self.y, self.x)
+        return "\n".join(rows)
+
+    def rows(self) -> 'List[bytes]':
+        return [self.map[row * self.map_size:(row + 1) * self.map_size] for row in range(self.map_size)]
+
+    def remaining_useful(self) -> int:
+        return self.map.count(MinerChallenge.USEFUL)
+
+    def remaining_useless(self) -> int:
+        return self.map.count(MinerChallenge.USELESS)
+
+    def key(self) -> tuple:
+        return super().key() + (self.x, self.y, self.useful_info_collected, self.useless_info_collected, self.steps, self.map)
+
     def clone(self):
-        return MinerChallenge(self.level, deepcopy(self.map), self.map_size, self.x, self.y, self.useful_info_collected, self.useless_info_collected, self.steps)
+        return MinerChallenge(self.level, self.map, self.map_size, self.x, self.y, self.useful_info_collected, self.useless_info_collected, self.steps,
+                              self.row_texts)
 
     @staticmethod
-    def random(level: int):
+    def random(level: int, rng: 'Random' = None):
+        rng = rng or Random()
         map_size = 5 + level if not Debug.debug else 9
-        # map[Y][X], map[Row][Col]
-        # 0 = Blank
-        # 1 = Useless Info
-        # 2 = Useful Info
-        # 4 = Player
-        # 5 = Destination
-        map = [[1 + randrange(0, 3) % 2 if randrange(1, 11) > 4 else 0 for _ in range(map_size)] for _ in range(map_size)]
-        map[0][0] = 0
-        map[map_size - 1][map_size - 1] = 5
+        # One random byte per cell, mapped to cells all at once
+        cells = map_size * map_size
+        map = rng.getrandbits(8 * cells).to_bytes(cells, "little").translate(MinerChallenge.cell_of_byte)
+        return MinerChallenge.from_map(level, map, map_size)
+
+    @staticmethod
+    def from_map(level: int, map: bytes, map_size: int):
+        # map[Y * map_size + X], row by row: BLANK, USELESS or USEFUL cells, the player starts in the top left corner
+        # and the destination is the bottom right one
+        map = bytes([MinerChallenge.BLANK]) + bytes(map[1:-1]) + bytes([MinerChallenge.DESTINATION])
         return MinerChallenge(level, map, map_size, 0, 0, 0, 0, 0)
 
+    @staticmethod
+    def from_rows(level: int, rows):
+        # A custom square map given as rows of cells
+        return MinerChallenge.from_map(level, b"".join(bytes(row) for row in rows), len(rows))
+
+    def best_route(self, node_budget: int = 20000) -> 'MinerRoute':
+        # The best route only depends on the map and the position, the collected counts just shift the final score
+        fingerprint = (self.map, self.map_size, self.x, self.y)
+        route = MinerChallenge.routes.get(fingerprint)
+        if route is None or (not route.optimal and route.nodes < node_budget):
+            import InfoFlow_Miner  # Loaded by the first route asked for, not by every client of the problem
+            route = InfoFlow_Miner.search_route(self.map, self.map_size, self.x, self.y, node_budget)
+            MinerChallenge.remember_route(self.map, self.map_size, self.x, self.y, route)
+        return route
+
+    def best_score(self, node_budget: int = 20000) -> int:
+        # The best submit score still achievable from the current position
+        return self.partial_score() + self.best_route(node_budget).gain
+
+    @staticmethod
+    def remember_route(map: bytes, map_size: int, x: int, y: int, route: 'MinerRoute') -> None:
+        # Every suffix of the route is the best route known from where it starts, so following the route hits the cache
+        gain = route.gain
+        for i, (off_x, off_y) in enumerate(route.moves):
+            if len(MinerChallenge.routes) >= MinerChallenge.max_routes:
+                del MinerChallenge.routes[next(iter(MinerChallenge.routes))]
+            MinerChallenge.routes[(map, map_size, x, y)] = type(route)(gain, route.moves[i:], route.optimal, route.nodes)
+            x, y = x + off_x, y + off_y
+            index = y * map_size + x
+            gain -= MinerChallenge.points_of_cell[map[index]] + MinerChallenge.points_of_step
+            if map[index] != MinerChallenge.BLANK:
+                map = map[:index] + b"\0" + map[index + 1:]
+
 
 class MinerChallengeState(ChallengeState):
+    moves = MinerChallenge.offsets
+    move_offsets = {op.id: offset for op, offset in zip(MinerChallenge.provided_ops, moves)}
+    offset_op_ids = {offset: op.id for op, offset in zip(MinerChallenge.provided_ops, moves)}
+
+    __slots__ = ()
+
     def __init__(self, old: 'State' = None):
         super().__init__(old)
 
-    def is_applicable_operator(self, op):
-        return (super().is_applicable_operator(op)
-                or (not self.player.current_challenge.is_at_dest() and
-                    ((self.player.current_challenge.can_move(0, -1) and op.id is MinerChallenge.provided_ops[0].id)
-                     or (self.player.current_challenge.can_move(0, 1) and op.id is MinerChallenge.provided_ops[1].id)
-                     or (self.player.current_challenge.can_move(1, 0) and op.id is MinerChallenge.provided_ops[2].id)
-                     or (self.player.current_challenge.can_move(-1, 0) and op.id is MinerChallenge.provided_ops[3].id))))
-
-    def apply_operator(self, op):
-        if super().is_applicable_operator(op):
-            return super().apply_operator(op)
+    def dynamic_op_ids(self):
+        c = self.player.current_challenge
+        if c.is_at_dest():
+            return ()
+        return tuple(op.id for op, (off_x, off_y) in zip(MinerChallenge.provided_ops, MinerChallengeState.moves) if c.can_move(off_x, off_y))
+
+    def suggested_op_id(self, node_budget: int = 20000):
+        route = self.player.current_challenge.best_route(node_budget)
+        return MinerChallengeState.offset_op_ids[route.moves[0]] if route.moves else None
+
+    def apply_move(self, op):
         ns = MinerChallengeState(self)
-        if op.id is MinerChallenge.provided_ops[0].id:
-            ns.player.current_challenge.move(0, -1)
-        elif op.id is MinerChallenge.provided_ops[1].id:
-            ns.player.current_challenge.move(0, 1)
-        elif op.id is MinerChallenge.provided_ops[2].id:
-            ns.player.current_challenge.move(1, 0)
-        elif op.id is MinerChallenge.provided_ops[3].id:
-            ns.player.current_challenge.move(-1, 0)
+        ns.player.current_challenge.move(*MinerChallengeState.move_offsets[op.id])
         if ns.player.current_challenge.is_at_dest():
             ns = ChallengeMenuState(ns)
             passed, score = ns.player.current_challenge.submit(ns.player)
@@ -1165,34 +1683,152 @@ This challenge is a representation about 'Velocity' in Big Data."""
                         .before("Nice try!", f"You only have a score of {score}."))
         return ns
 
-    def describe_state(self):
-        map = self.player.current_challenge.map
-        map_size = self.player.current_challenge.map_size
+    def format_description(self):
+        return self.player.current_challenge.grid_text()
 
-        def is_player(row, col):
-            return self.player.current_challenge.x is col and self.player.current_challenge.y is row
+    def format_text(self) -> str:
+        return f"{super().format_text()}\n{self.describe_state()}"
 
-        return "\n".join([f"[{', '.join(['4' if is_player(row, col) else str(map[row][col]) for col in range(map_size)])}]" for row in range(map_size)])
 
-    def __str__(self):
-        return f"{super().__str__()}\n{self.describe_state()}"
+class Challenges:
+    # (random challenge of a level drawn with an RNG, state type playing it, challenge type, transition handling its provided_ops)
+    all = []
+
+    @staticmethod
+    def register(random_challenge, state_type, challenge_type, transition) -> None:
+        Challenges.all.append((random_challenge, state_type, challenge_type, transition))
+        state_type.transitions = {**state_type.transitions, **{op.id: transition for op in challenge_type.provided_ops}}
+
+
+Challenges.register(lambda level, rng: NewsSortingChallenge.random(level, rng), NewsSortingChallengeState,
+                    NewsSortingChallenge, NewsSortingChallengeState.apply_sort)
+Challenges.register(lambda level, rng: MythBusterChallenge.random(level, rng), MythBusterChallengeState,
+                    MythBusterChallenge, MythBusterChallengeState.apply_guess)
+Challenges.register(lambda level, rng: InstantMemChallenge.random(level, rng), InstantMemChallengeState,
+                    InstantMemChallenge, InstantMemChallengeState.apply_recall)
+Challenges.register(lambda level, rng: MinerChallenge.random(level, rng), MinerChallengeState,
+                    MinerChallenge, MinerChallengeState.apply_move)
+
+
+class ChallengePool:
+    """Challenges built ahead of time, up to `size` per level and type of Challenges.all, so that drawing an offer is
+    just a pop. The n-th challenge of a level and type is always built from the same seed, derived from the pool's
+    seed, whether it comes ready from the pool (a hit) or is built when it is asked for (a miss): the challenges
+    handed out only depend on the seed and the order of the requests, never on the timing of the refills.
+
+    The pool is used by ChallengeMenuState once installed, and only filled by fill(), e.g. between two games. A
+    thread refilling it while the game is played competes with the game for the interpreter and loses: it made
+    games slower and most takes still missed."""
+
+    installed = None
+
+    def __init__(self, size: int = 4, seed: int = None):
+        self.size = size
+        self.seed = seed if seed is not None else getrandbits(64)
+        self.ready = {}  # (level, kind) -> {sequence number: challenge}
+        self.next = {}  # (level, kind) -> sequence number of the next challenge handed out
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def build(self, level: int, kind: int, n: int) -> 'Challenge':
+        seed = derive_seed(derive_seed(self.seed ^ (level << 8 | kind)) ^ n)
+        return Challenges.all[kind][0](level, Random(seed))
+
+    def take(self, level: int, kind: int) -> 'Challenge':
+        key = level, kind
+        with self.lock:
+            n = self.next.get(key, 0)
+            self.next[key] = n + 1
+            challenge = self.ready.setdefault(key, {}).pop(n, None)
+            if challenge is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return challenge if challenge is not None else self.build(level, kind, n)
+
+    def missing(self):
+        # (level, kind, sequence number) of the challenges a full pool would hold but this one does not
+        with self.lock:
+            return [(level, kind, n) for level in range(len(Challenge.challenge_rewards)) for kind in range(len(Challenges.all))
+                    for n in range(self.next.get((level, kind), 0), self.next.get((level, kind), 0) + self.size)
+                    if n not in self.ready.get((level, kind), ())]
+
+    def fill(self) -> int:
+        # Builds every missing challenge, returns how many were built
+        built = 0
+        for level, kind, n in self.missing():
+            challenge = self.build(level, kind, n)
+            with self.lock:
+                if n >= self.next.get((level, kind), 0):  # Not handed out in the meantime
+                    self.ready.setdefault((level, kind), {})[n] = challenge
+                    built += 1
+        return built
+
+    def install(self) -> 'ChallengePool':
+        ChallengePool.installed = self
+        return self
 
+    def uninstall(self) -> None:
+        if ChallengePool.installed is self:
+            ChallengePool.installed = None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(ready) for ready in self.ready.values())
 
-class Challenges:
-    all = [
-        (lambda level: NewsSortingChallenge.random(level),
-         lambda old: NewsSortingChallengeState(old=old),
-         NewsSortingChallenge),
-        (lambda level: MythBusterChallenge.random(level),
-         lambda old: MythBusterChallengeState(old=old),
-         MythBusterChallenge),
-        (lambda level: InstantMemChallenge.random(level),
-         lambda old: InstantMemChallengeState(old=old),
-         InstantMemChallenge),
-        (lambda level: MinerChallenge.random(level),
-         lambda old: MinerChallengeState(old=old),
-         MinerChallenge)
-    ]
+
+class TranspositionTable:
+    """Maps states to arbitrary values by their canonical State.key(), so that searches, solvers and dedup passes
+    can recognize a state they have already seen in O(1). With max_size set, the oldest entries are evicted first."""
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, s: 'State', default=None):
+        value = self.entries.get(s.key(), default)
+        if value is default:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, s: 'State', value) -> None:
+        key = s.key()
+        if self.max_size is not None and key not in self.entries and len(self.entries) >= self.max_size:
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = value
+
+    def add(self, s: 'State') -> bool:
+        # Records s as seen and returns True if it was not seen before
+        if s in self:
+            return False
+        self.put(s, True)
+        return True
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def __contains__(self, s: 'State') -> bool:
+        return s.key() in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_applicability_vectors = {}
+
+
+def applicability_vector_of(op_ids: frozenset) -> tuple:
+    # Only a handful of distinct id sets exist, so each vector over OPERATORS is built once and shared
+    vector = _applicability_vectors.get(op_ids)
+    if vector is None:
+        vector = _applicability_vectors[op_ids] = tuple(op.id in op_ids for op in OPERATORS)
+    return vector
 
 
 def goal_message(s: State) -> str:
@@ -1210,6 +1846,11 @@ def copy_state(old: State) -> State:
 def goal_test(s: 'State') -> bool: return s.is_goal()
 
 
+def new_game(seed: int = None) -> State:
+    # The seed fully determines the game played with a given sequence of operators
+    return GameStartState(seed=seed)
+
+
 # </COMMON_CODE>
 
 # <COMMON_DATA>
@@ -1220,7 +1861,7 @@ INITIAL_STATE = GameStartState()
 # </INITIAL_STATE>
 
 # <OPERATORS>
-OPERATORS = Operator.all_ops + list(chain.from_iterable([ch.provided_ops for _, _, ch in Challenges.all]))
+OPERATORS = Operator.all_ops + list(chain.from_iterable([ch.provided_ops for _, _, ch, _ in Challenges.all]))
 # </OPERATORS>
 
 # <GOAL_TEST> (optional)
@@ -181,7 +181,7 @@ class StateRenderer:
         global OPERATORS
         display.list_operators.delete(0, tk.END)
         if OPERATORS:
-            ops = [(ind, op) for ind, op in enumerate(OPERATORS) if state.is_applicable_operator(op)]
+            ops = [(ind, op) for ind, (op, applicable) in enumerate(zip(OPERATORS, state.applicability_vector())) if applicable]
             for ind, op in ops:
                 display.list_operators.insert(tk.END, f"{ind:2}: {op.name}")
 
@@ -224,19 +224,20 @@ class GameStartStateRenderer(StateRenderer):
                 return self.x < -300
 
         @staticmethod
-        def random() -> 'GameStartStateRenderer.Rain':
-            x, speed = (random.randint(-800, -500), random.random() * 32 + 2) if random.randint(0, 1) is 0 else (600 + random.randint(500, 800), -(random.random() * 32 + 2))
-            return GameStartStateRenderer.Rain(content=random.choices(population=["0", "1", "0", "1", "0", "1", "0", "1"], k=random.randint(6, 18)),
-                                               # x=random.randint(-10, 590), y=random.randint(-500, -300), speed=random.random() * 32 + 2,
-                                               x=x, y=random.randint(-10, 390), speed=speed,
-                                               size=random.randint(4, 24), color=Style.color_text)
+        def random(rng: 'random.Random') -> 'GameStartStateRenderer.Rain':
+            x, speed = (rng.randint(-800, -500), rng.random() * 32 + 2) if rng.randint(0, 1) == 0 else (600 + rng.randint(500, 800), -(rng.random() * 32 + 2))
+            return GameStartStateRenderer.Rain(content=rng.choices(population=["0", "1", "0", "1", "0", "1", "0", "1"], k=rng.randint(6, 18)),
+                                               # x=rng.randint(-10, 590), y=rng.randint(-500, -300), speed=rng.random() * 32 + 2,
+                                               x=x, y=rng.randint(-10, 390), speed=speed,
+                                               size=rng.randint(4, 24), color=Style.color_text)
 
     def init(self, display, state):
         self.rect_outer = display.canvas_game.create_rectangle(180, 130, 420, 270, width=4, fill=Style.color_text, outline=Style.color_text)
         self.rect_inner = display.canvas_game.create_rectangle(184, 134, 416, 266, width=2, fill=Style.color_text, outline=Style.color_background)
         self.font_title = Style.get_font("Gill Sans MT", 40, True, nocache=True)
         self.text_title = display.canvas_game.create_text(300, 200, text="Info Flow", fill=Style.color_background, font=self.font_title)
-        self.rains = [GameStartStateRenderer.Rain.random() for _ in range(40)]
+        self.rng = state.rng()
+        self.rains = [GameStartStateRenderer.Rain.random(self.rng) for _ in range(40)]
         self.text_rains = []
         for r in self.rains:
             self.text_rains.append(display.canvas_game.create_text(r.x, r.y, anchor=tk.NW, font=Style.get_font("Consolas", r.size), text=r.text, fill=r.color))
@@ -259,7 +260,7 @@ class GameStartStateRenderer(StateRenderer):
                     display.canvas_game.delete(t)
                 rains.remove(r)
                 text_rains.remove(t)
-                nr = GameStartStateRenderer.Rain.random()
+                nr = GameStartStateRenderer.Rain.random(self.rng)
                 rains.append(nr)
                 text_rains.append(display.canvas_game.create_text(nr.x, nr.y, anchor=tk.NW, font=Style.get_font("Consolas", nr.size), text=nr.text, fill=nr.color))
         self.rains, self.text_rains = rains, text_rains
@@ -285,7 +286,8 @@ class GameStartStateRenderer(StateRenderer):
 
 class ChallengeMenuStateRenderer(StateRenderer):
     def init(self, display, state):
-        self.c_menus = [[i * 100 + 50, 100 + 50 * i, random.randint(0, 50), random.randint(0, 10), .5, .5] for i in range(4)]
+        rng = state.rng()
+        self.c_menus = [[i * 100 + 50, 100 + 50 * i, rng.randint(0, 50), rng.randint(0, 10), .5, .5] for i in range(4)]
         self.font = Style.get_font(Style.font_name_default, 28, italic=True)
         self.label_accept = display.canvas_game.create_text(self.c_menus[0][0], self.c_menus[0][1], anchor=W,
                                                             text=OperatorIds.CHALLENGE_ACCEPT.value, fill=Style.color_text, font=self.font)
@@ -377,7 +379,7 @@ class NewsSortingChallengeStateRenderer(StateRenderer):
 
     def render(self, display: 'StateDisplay', state: 'State', last_state: 'State'):
         super().render(display, state, last_state)
-        display.canvas_game.create_text(300, 200, text=f"News: {state.player.current_challenge.to_sort[state.news_index]}", fill=Style.color_text,
+        display.canvas_game.create_text(300, 200, text=f"News: {state.player.current_challenge.news(state.news_index)}", fill=Style.color_text,
                                         font=Style.get_font(Style.font_name_default, 40), width=550)
 
 
@@ -387,7 +389,7 @@ class MythBusterChallengeStateRenderer(StateRenderer):
 
     def render(self, display: 'StateDisplay', state: 'State', last_state: 'State'):
         super().render(display, state, last_state)
-        display.canvas_game.create_text(300, 200, text=f"Statement: {state.player.current_challenge.myths[state.myth_index]}", fill=Style.color_text,
+        display.canvas_game.create_text(300, 200, text=f"Statement: {state.player.current_challenge.myth(state.myth_index)}", fill=Style.color_text,
                                         font=Style.get_font(Style.font_name_default, 40), width=550)
 
     def is_static_post_renderer(self):
@@ -451,9 +453,9 @@ class MinerChallengeStateRenderer(StateRenderer):
                                         font=self.font_text, fill=Style.color_text, width=550, anchor=N, justify=tk.CENTER)
         for y in range(map_size):
             for x in range(map_size):
-                c = state.player.current_challenge.map[y][x]
-                color = None if c is 0 else "#AA0000" if c is 1 else "green" if c is 2 else "blue" if c is 4 else "brown" if c is 5 else "black"
-                text = "" if c is 0 else "Trash" if c is 1 else "Info" if c is 2 else "Player" if c is 4 else "Goal" if c is 5 else ""
+                c = state.player.current_challenge.cell(x, y)
+                color = None if c == 0 else "#AA0000" if c == 1 else "green" if c == 2 else "blue" if c == 4 else "brown" if c == 5 else "black"
+                text = "" if c == 0 else "Trash" if c == 1 else "Info" if c == 2 else "Player" if c == 4 else "Goal" if c == 5 else ""
                 display.canvas_game.create_rectangle(x0 + padx + x * self.cell_width, y0 + pady + y * self.cell_height,
                                                      x0 + padx + (x + 1) * self.cell_width, y0 + pady + (y + 1) * self.cell_height,
                                                      fill=color, outline=Style.color_foreground)
@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+"""InfoFlow_Benchmark.py
+ Micro benchmarks for the InfoFlow problem formulation.
+
+ Usage:
+  python3 InfoFlow_Benchmark.py memory [--steps N] [--seed S] [--baseline OTHER_InfoFlow.py]
+  python3 InfoFlow_Benchmark.py miner [--maps N] [--seed S] [--sizes 5 6 7 8 9 ...] [--budget NODES]
+  python3 InfoFlow_Benchmark.py search [--games N] [--seed S] [--nodes N] [--ms MS] [--max-steps M]
+  python3 InfoFlow_Benchmark.py save [--steps N] [--seed S]
+
+ The memory benchmark plays a random game, keeps every state the way the
+ clients used to keep their STATE_STACK, and reports the bytes held per state,
+ then the bytes per move of a SOLUZION_Session.GameSession of the same length.
+ Passing --baseline loads another revision of InfoFlow.py side by side, e.g.
+  git show <rev>:InfoFlow.py > /tmp/InfoFlow_old.py
+ so that the before/after numbers come from the same run.
+
+ The miner benchmark scores random walks on random Miner maps against the
+ routes of InfoFlow_Miner.search_route(), to show how far random play falls
+ short of the best achievable submit score and what the solver costs.
+
+ The search benchmark plays whole games with InfoFlow_Search and reports
+ the nodes it expands per second and the rounds it needs to reach the goal.
+
+ The save benchmark writes the states of a random game to a stream with
+ InfoFlow_Save.py and with pickle, and reports the bytes per state and the
+ states written, read and scanned per second, after checking that every state
+ is loaded back equal to the one saved.
+"""
+import argparse
+import importlib.util
+import io
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from statistics import mean
+
+
+def load_problem(path: str, name: str = None):
+    spec = importlib.util.spec_from_file_location(name or os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def start_state(problem, seed: int):
+    # Revisions with per-state seeds draw their challenges from the game seed rather than the global RNG
+    return problem.new_game(seed) if hasattr(problem, "new_game") else problem.copy_state(problem.INITIAL_STATE)
+
+
+def random_walk(problem, steps: int, seed: int):
+    random.seed(seed)
+    state = start_state(problem, seed)
+    stack = [state]
+    for _ in range(steps):
+        if problem.goal_test(state):
+            state = start_state(problem, random.getrandbits(64))
+        ops = [op for op in problem.OPERATORS if op.is_applicable(state)]
+        state = random.choice(ops).apply(state)
+        stack.append(state)
+    return stack
+
+
+def bytes_per_state(problem, steps: int, seed: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stack = random_walk(problem, steps, seed)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / len(stack)
+
+
+def bytes_per_move(problem, steps: int, seed: int) -> float:
+    # The same walk recorded by a GameSession, which keeps the moves and a snapshot every 32 of them
+    from SOLUZION_Session import GameSession
+    rng = random.Random(seed)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [GameSession(problem, rng.getrandbits(64))]
+    for _ in range(steps):
+        if sessions[-1].goal:
+            sessions.append(GameSession(problem, rng.getrandbits(64)))
+        session = sessions[-1]
+        session.apply(rng.choice([i for i, op in enumerate(session.operators) if op.is_applicable(session.state)]))
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held / steps
+
+
+def bench_memory(args):
+    problems = [("current", load_problem(os.path.join(os.path.dirname(os.path.abspath(__file__)), "InfoFlow.py"), "InfoFlow_current"))]
+    if args.baseline:
+        problems.insert(0, ("baseline", load_problem(args.baseline, "InfoFlow_baseline")))
+    results = {}
+    for label, problem in problems:
+        results[label] = bytes_per_state(problem, args.steps, args.seed)
+        print(f"{label:>8}: {results[label]:10.1f} bytes/state over {args.steps + 1} states")
+    session = bytes_per_move(problems[-1][1], args.steps, args.seed)
+    print(f" session: {session:10.1f} bytes/move over {args.steps} moves")
+    if "baseline" in results:
+        print(f"   ratio: {results['current'] / results['baseline']:10.3f}")
+
+
+def random_miner_score(challenge, rng) -> int:
+    challenge = challenge.clone()
+    while not challenge.is_at_dest():
+        challenge.move(*rng.choice([offset for offset in type(challenge).offsets if challenge.can_move(*offset)]))
+    return challenge.partial_score()
+
+
+def bench_miner(args):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import InfoFlow
+    import InfoFlow_Miner
+    miner = InfoFlow.MinerChallenge
+    rng = random.Random(args.seed)
+    print(f"{'size':>5}{'random':>10}{'monotone':>10}{'greedy':>10}{'solver':>10}{'optimal':>9}{'ms/solve':>10}")
+    for size in args.sizes:
+        scores = {"random": [], "monotone": [], "greedy": [], "solver": []}
+        optimal, elapsed = 0, 0.
+        for _ in range(args.maps):
+            challenge = miner.from_map(0, rng.getrandbits(8 * size * size).to_bytes(size * size, "little").translate(miner.cell_of_byte), size)
+            scores["random"].append(random_miner_score(challenge, rng))
+            scores["monotone"].append(InfoFlow_Miner.monotone_route(challenge.map, size, 0, 0).gain)
+            scores["greedy"].append(InfoFlow_Miner.greedy_route(challenge.map, size, 0, 0).gain)
+            start = time.perf_counter()
+            route = InfoFlow_Miner.search_route(challenge.map, size, 0, 0, args.budget)
+            elapsed += time.perf_counter() - start
+            scores["solver"].append(route.gain)
+            optimal += route.optimal
+        print(f"{size:>5}" + "".join(f"{mean(scores[name]):>10.1f}" for name in scores)
+              + f"{optimal / args.maps:>9.0%}{elapsed / args.maps * 1000:>10.1f}")
+
+
+def bench_search(args):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import InfoFlow
+    import InfoFlow_Search
+    rounds, won, steps_played = [], 0, 0
+    search = InfoFlow_Search.GameTreeSearch(InfoFlow, nodes=args.nodes, ms=args.ms, seed=args.seed)
+    for game in range(args.games):
+        state, steps = InfoFlow.new_game(args.seed + game), 0
+        while steps < args.max_steps and not InfoFlow.goal_test(state):
+            state = search.best_operator(state).apply(state)
+            steps += 1
+        steps_played += steps
+        if state.is_goal_state:
+            won += 1
+            rounds.append(state.round)
+        print(f"game {game}: {'goal in round ' + str(state.round) if state.is_goal_state else 'no goal'} after {steps} moves")
+    print(f"{search.nodes_per_second():.0f} nodes/s, {search.elapsed / max(1, steps_played) * 1000:.1f} ms/move, "
+          f"won {won}/{args.games}" + (f", rounds to goal: mean {mean(rounds):.1f}, max {max(rounds)}" if rounds else ""))
+
+
+def bench_save(args):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import InfoFlow
+    import InfoFlow_Save
+    states = random_walk(InfoFlow, args.steps, args.seed)
+    for s in states:
+        s.key()  # Draws the menus' offers, so that both formats save them
+
+    def pickle_write():
+        f = io.BytesIO()
+        for s in states:
+            pickle.dump(s, f, pickle.HIGHEST_PROTOCOL)
+        return f
+
+    def pickle_read(f):
+        f.seek(0)
+        loaded = []
+        while f.tell() < len(f.getbuffer()):
+            loaded.append(pickle.load(f))
+        return loaded
+
+    def save_write():
+        f = io.BytesIO()
+        InfoFlow_Save.GameWriter(f).write_all(states)
+        return f
+
+    def save_read(f):
+        f.seek(0)
+        return list(InfoFlow_Save.GameReader(f))
+
+    def save_scan(f):
+        f.seek(0)
+        return list(InfoFlow_Save.GameReader(f).summaries())
+
+    print(f"{'format':>8}{'bytes/state':>13}{'write/s':>10}{'read/s':>10}{'scan/s':>10}")
+    for label, write, read, scan in (("pickle", pickle_write, pickle_read, None), ("save", save_write, save_read, save_scan)):
+        start = time.perf_counter()
+        f = write()
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = read(f)
+        elapsed = time.perf_counter() - start
+        if [s.key() for s in loaded] != [s.key() for s in states]:
+            raise AssertionError(f"{label}: the states loaded differ from the states saved")
+        scanned = "-"
+        if scan:
+            start = time.perf_counter()
+            scan(f)
+            scanned = f"{len(states) / (time.perf_counter() - start):.0f}"
+        print(f"{label:>8}{len(f.getbuffer()) / len(states):>13.1f}{len(states) / written:>10.0f}{len(states) / elapsed:>10.0f}{scanned:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="InfoFlow benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    memory = sub.add_parser("memory", help="bytes held per state in a STATE_STACK and per move of a session")
+    memory.add_argument("--steps", type=int, default=5000)
+    memory.add_argument("--seed", type=int, default=0)
+    memory.add_argument("--baseline", help="another InfoFlow.py to compare against")
+    memory.set_defaults(func=bench_memory)
+    miner = sub.add_parser("miner", help="random play against the best Miner routes")
+    miner.add_argument("--maps", type=int, default=20, help="random maps per size")
+    miner.add_argument("--seed", type=int, default=0)
+    miner.add_argument("--sizes", type=int, nargs="+", default=[5, 6, 7, 8, 9])
+    miner.add_argument("--budget", type=int, default=1000000, help="nodes the search may expand per map")
+    miner.set_defaults(func=bench_miner)
+    search = sub.add_parser("search", help="whole games played by the Monte Carlo tree search")
+    search.add_argument("--games", type=int, default=5)
+    search.add_argument("--seed", type=int, default=0)
+    search.add_argument("--nodes", type=int, default=100, help="iterations per move, 0 for no limit")
+    search.add_argument("--ms", type=float, help="milliseconds per move")
+    search.add_argument("--max-steps", type=int, default=1000)
+    search.set_defaults(func=bench_search)
+    save = sub.add_parser("save", help="binary save files against pickle")
+    save.add_argument("--steps", type=int, default=20000)
+    save.add_argument("--seed", type=int, default=0)
+    save.set_defaults(func=bench_save)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
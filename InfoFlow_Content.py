@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""InfoFlow_Content.py
+ Builds the SQLite content store that InfoFlow.py reads its news, myths and
+ memory sentences from, instead of the literals in the source.
+
+ Usage:
+  python3 InfoFlow_Content.py [--db FILE] [--news FILE ...] [--myths FILE ...]
+
+ The store holds the literal pools of InfoFlow.py plus the entries of the
+ given tab-separated files: "category<TAB>headline" lines for --news, with
+ a category of NewsInformation.all_categories, and "fact|myth<TAB>content"
+ lines for --myths. The file is written next to InfoFlow.py by default, where
+ InfoFlow.py picks it up on import (see CONTENT_STORE, or set the
+ INFOFLOW_CONTENT environment variable to another file, or to nothing to
+ keep the literals).
+"""
+import argparse
+import os
+import sys
+import time
+
+# The literal pools are what the store is built from, even where a store already exists
+os.environ["INFOFLOW_CONTENT"] = ""
+import InfoFlow  # noqa: E402
+from InfoFlow import ContentStore, NewsInformation, Myth, NewsSortingChallenge, MythBusterChallenge, InstantMemChallenge  # noqa: E402
+
+
+def read_tsv(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line and not line.startswith("#"):
+                yield line.split("\t", 1)
+
+
+def read_news(path: str):
+    for category, content in read_tsv(path):
+        if category not in NewsInformation.all_categories:
+            raise ValueError(f"{path}: unknown news category {category!r}")
+        yield NewsInformation(category, content)
+
+
+def read_myths(path: str):
+    for kind, content in read_tsv(path):
+        if kind not in ("fact", "myth"):
+            raise ValueError(f"{path}: a myth is either 'fact' or 'myth', not {kind!r}")
+        yield Myth(content, kind == "fact")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the content store of InfoFlow")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(InfoFlow.__file__)), "InfoFlow_Content.sqlite"))
+    parser.add_argument("--news", nargs="*", default=[], help="files of category<TAB>headline lines")
+    parser.add_argument("--myths", nargs="*", default=[], help="files of fact|myth<TAB>content lines")
+    args = parser.parse_args(argv)
+
+    news = list(NewsSortingChallenge.news_collection)
+    for path in args.news:
+        news += read_news(path)
+    myths = list(MythBusterChallenge.all_myths)
+    for path in args.myths:
+        myths += read_myths(path)
+    start = time.perf_counter()
+    ContentStore.write(args.db, {
+        "news": (news, lambda info: info.category, lambda info: [info.category, info.content]),
+        "myths": (myths, lambda myth: myth.is_fact, lambda myth: [myth.content, myth.is_fact]),
+        "sentences": (InstantMemChallenge.all_sentences, lambda group: None, list)})
+    elapsed = time.perf_counter() - start
+    for pool in ("news", "myths", "sentences"):
+        store = ContentStore.load(pool, tuple, args.db)
+        print(f"{pool}: {len(store)} entries in {len(store.ids_by_category)} categories")
+    print(f"{args.db} written in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
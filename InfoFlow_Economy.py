@@ -0,0 +1,219 @@
+#!/usr/bin/python3
+"""InfoFlow_Economy.py
+ An abstract model of the InfoFlow economy and the menu policy that pays off
+ the debt in the fewest expected rounds.
+
+ Usage:
+  python3 InfoFlow_Economy.py [--success P] [--save FILE]
+
+ The model only keeps what the menu decisions depend on: money, debt,
+ energy and difficulty level, with the rewards, penalties, energy costs,
+ energy recovery and debt growth read from Challenge and State. An accepted
+ challenge is passed with probability P, for the completion levels of
+ `outcomes`. Money only ever pays off the debt, and paying earlier saves
+ interest, so the policy pays as soon as there is money; the value
+ iteration runs over the remaining states, where money is not positive.
+
+ Accepting, declining and paying all happen within a round and each strictly
+ lowers the energy or the money, so one sweep in that order settles a whole
+ round (Gauss-Seidel); only ending the round costs 1 and refers back to the
+ previous sweep. The policy is kept as one byte per state, so a player
+ looks up its move in O(1) (see EconomyModel.operator_for). The AutoPlayer
+ and the simulator play it through economy_op_index().
+"""
+import argparse
+import pickle
+import sys
+import time
+
+from InfoFlow import Challenge, State, PlayerInfo, OperatorIds, ChallengeMenuState
+
+END, ACCEPT, DECLINE = 0, 1, 2
+ACTION_OPS = (OperatorIds.FINISH_ROUND, OperatorIds.CHALLENGE_ACCEPT, OperatorIds.CHALLENGE_DECLINE)
+
+
+class EconomyModel:
+    version = 1
+
+    def __init__(self, success: float = 1., outcomes=((.75, 1.), (.25, .8)), money_step: int = 25,
+                 min_money: int = -1000, max_debt: int = 1500, horizon: float = 100.):
+        # outcomes: (probability, completion level) of a passed challenge, by default the three quizzes passed with
+        # every answer right and the Miner, which always completes at .8
+        self.success = success
+        self.outcomes = outcomes
+        self.money_step = money_step
+        self.horizon = horizon
+        self.rewards = tuple(Challenge.challenge_rewards)
+        self.multipliers = tuple(Challenge.reward_completion_multiplier)
+        self.energy_step = Challenge.energy_accept_multiplier_level
+        self.money_decline = Challenge.money_decline
+        self.energy_recovered = State.energy_recovered_per_round
+        self.debt_growth = State.debt_growth_per_round
+        self.max_energy = PlayerInfo().energy
+        self.levels = len(self.rewards)
+        self.moneys = -min_money // money_step + 1  # money = -i * money_step
+        self.debts = max_debt // money_step + 1  # debt = j * money_step
+        self.energies = self.max_energy // self.energy_step + 1  # energy = k * energy_step
+        self.values = None
+        self.actions = None
+        self.sweeps = 0
+
+    def constants(self) -> tuple:
+        return (self.rewards, self.multipliers, self.energy_step, self.money_decline, self.energy_recovered,
+                self.debt_growth, self.max_energy, self.success, tuple(self.outcomes), self.money_step,
+                self.moneys, self.debts)
+
+    def index(self, i: int, j: int, k: int, level: int) -> int:
+        return ((level * self.energies + k) * self.moneys + i) * self.debts + j
+
+    def debt_bucket(self, debt: float) -> int:
+        # Any debt left, however small, is not the goal yet
+        return min(self.debts - 1, max(1 if debt > 0 else 0, round(debt / self.money_step)))
+
+    def money_bucket(self, money: float) -> int:
+        return min(self.moneys - 1, max(0, round(-money / self.money_step)))
+
+    def transitions(self, i: int, j: int, k: int, level: int):
+        # (outcomes of ending the round, state after declining, outcomes of accepting or None if the energy is too low)
+        # where outcomes are (probability, state) and a state of -1 is the goal
+        step = self.money_step
+        # The grown debt is split between the two nearest steps so that its expected value stays exact
+        debt = int(j * step * self.debt_growth) / step
+        lower = min(self.debts - 1, int(debt))
+        recovered = min(self.energies - 1, k + self.energy_recovered // self.energy_step)
+        end = ((1 - (debt - lower), self.index(i, lower, recovered, level)),
+               (debt - lower, self.index(i, min(self.debts - 1, lower + 1), recovered, level)))
+        decline = self.index(self.money_bucket(-i * step + self.money_decline), j, k, max(0, level - 1))
+        cost = level + 5  # Challenge.energy_consume() in energy steps
+        if k < cost:
+            return end, decline, None
+        accept = [(1 - self.success, self.index(i, j, k - cost, max(0, level - 1)))] if self.success < 1 else []
+        for probability, completion in self.outcomes:
+            money = -i * step + self.rewards[level] * self.multipliers[int(completion * 5)]
+            if money > 0:
+                debt = j * step - money
+                following = -1 if debt <= 0 else self.index(0, self.debt_bucket(debt), k - cost, min(self.levels - 1, level + 1))
+            else:
+                following = self.index(self.money_bucket(money), j, k - cost, min(self.levels - 1, level + 1))
+            if following >= 0 and following % self.debts == 0:
+                following = -1
+            accept.append((self.success * probability, following))
+        return end, decline, tuple(accept)
+
+    def solve(self, tolerance: float = 1e-3, max_sweeps: int = 500) -> 'EconomyModel':
+        size = self.levels * self.energies * self.moneys * self.debts
+        # Starting from the horizon, the values only go down, so declining in a circle at the lowest money never
+        # looks free; the states without debt are the goal
+        values, actions = [self.horizon] * size, bytearray(size)
+        for s in range(0, size, self.debts):
+            values[s] = 0.
+        # Accepting lowers the energy and declining lowers the money, so they lead to states earlier in this order
+        order = [(self.index(i, j, k, level), self.transitions(i, j, k, level))
+                 for k in range(self.energies) for i in reversed(range(self.moneys)) for level in range(self.levels)
+                 for j in range(1, self.debts)]
+        horizon = self.horizon
+        for sweep in range(max_sweeps):
+            delta = 0.
+            for s, (end, decline, accept) in order:
+                best, action = 1 + end[0][0] * values[end[0][1]] + end[1][0] * values[end[1][1]], END
+                if accept is not None:
+                    value = sum(probability * values[following] for probability, following in accept if following >= 0)
+                    if value < best:
+                        best, action = value, ACCEPT
+                if values[decline] < best:
+                    best, action = values[decline], DECLINE
+                if best > horizon:
+                    best = horizon
+                if values[s] - best > delta:
+                    delta = values[s] - best
+                values[s], actions[s] = best, action
+            self.sweeps = sweep + 1
+            if delta < tolerance:
+                break
+        self.values, self.actions = values, bytes(actions)
+        return self
+
+    def state_index(self, money: float, debt: float, energy: int, level: int) -> int:
+        return self.index(self.money_bucket(money), self.debt_bucket(debt), energy // self.energy_step, level)
+
+    def expected_rounds(self, money: float, debt: float, energy: int, level: int) -> float:
+        return self.values[self.state_index(money, debt, energy, level)]
+
+    def lookup(self, money: float, debt: float, energy: int, level: int) -> 'OperatorIds':
+        if debt > 0 and money > 0:
+            return OperatorIds.PAY_DEBT
+        return ACTION_OPS[self.actions[self.state_index(money, debt, energy, level)]]
+
+    def operator_for(self, state) -> 'OperatorIds':
+        # The menu decision for a ChallengeMenuState without an accepted challenge, None for any other state
+        if not isinstance(state, ChallengeMenuState) or state.has_challenge():
+            return None
+        p = state.player
+        op_id = self.lookup(p.money, p.debt, p.energy, p.difficulty_level)
+        return op_id if op_id in state.applicable_op_ids() else OperatorIds.FINISH_ROUND
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump({"version": EconomyModel.version, "constants": self.constants(), "horizon": self.horizon,
+                         "values": self.values, "actions": self.actions, "sweeps": self.sweeps}, f)
+
+    @staticmethod
+    def load(path: str, **kwargs) -> 'EconomyModel':
+        # kwargs are the model parameters the table was solved with, a table of other rules or parameters is refused
+        model = EconomyModel(**kwargs)
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+        if saved["version"] != EconomyModel.version or saved["constants"] != model.constants():
+            raise ValueError(f"{path} was solved for other game constants or model parameters")
+        model.horizon, model.values, model.actions, model.sweeps = saved["horizon"], saved["values"], saved["actions"], saved["sweeps"]
+        return model
+
+
+# Solved by solved_model() on first use
+_solved = None
+
+
+def solved_model() -> 'EconomyModel':
+    # The default model, solved once per process in a few seconds, then every menu move is a table lookup
+    global _solved
+    if _solved is None:
+        _solved = EconomyModel().solve()
+    return _solved
+
+
+def suggested_op_index(operators, state, legal: list, rng) -> int:
+    # Index in operators of the operator the problem's solver recommends for state (the challenges), a legal one
+    # drawn with rng.choice where there is no recommendation
+    suggested = state.suggested_op_id() if hasattr(state, "suggested_op_id") else None
+    for i in legal:
+        if operators[i].id == suggested:
+            return i
+    return rng.choice(legal)
+
+
+def economy_op_index(operators, state, legal: list, rng) -> int:
+    # The menu decisions of the solved model, the suggested operators in the challenges
+    menu = solved_model().operator_for(state)
+    if menu is None:
+        return suggested_op_index(operators, state, legal, rng)
+    return next(i for i in legal if operators[i].id == menu)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the menu policy of the InfoFlow economy")
+    parser.add_argument("--success", type=float, default=1., help="probability of passing an accepted challenge")
+    parser.add_argument("--save", help="file to save the policy table to")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = EconomyModel(success=args.success).solve()
+    elapsed = time.perf_counter() - start
+    p = PlayerInfo()
+    print(f"{len(model.actions)} states solved in {model.sweeps} sweeps, {elapsed:.2f}s")
+    print(f"expected round of the goal from the start: {1 + model.expected_rounds(p.money, p.debt, p.energy, p.difficulty_level):.2f}")
+    if args.save:
+        model.save(args.save)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""InfoFlow_Load.py
+ Load generator for SOLUZION_Server.py, on loopback only.
+
+ Usage:
+  python3 InfoFlow_Load.py [--players N] [--duration S] [--steps M] [--think MS] [--ramp S] [--seed S]
+                           [--host H] [--port P | --unix PATH] [--spawn]
+
+ Opens one connection per simulated player and plays sessions on it until the
+ duration is over: NEW, then up to --steps moves, each of them OPS and APPLY
+ of an operator drawn from the applicable ones the server lists, so the
+ players walk real operator sequences of OPERATORS under the applicability
+ rules of the states; then STATE and CLOSE. A player waits a random think time
+ of 0 to 2 x --think ms (--think on average) before every move, and the
+ players start over --ramp seconds.
+
+ Reports the sessions played to the end per second and the p50/p95/p99 latency of every
+ request type, APPLY split by the name of the operator, measured from sending
+ the request to reading its reply. With --spawn the server is started as a
+ subprocess on the given port for the run, otherwise it must be running.
+ Past a few thousand players the single-threaded client itself may be what is
+ measured, watch its CPU.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+from SOLUZION_Server import is_loopback
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # Request type -> seconds of every request
+        self.sessions = 0
+        self.goals = 0
+        self.errors = 0
+
+    def add(self, request: str, seconds: float) -> None:
+        self.latencies.setdefault(request, []).append(seconds)
+
+    @staticmethod
+    def percentile(ordered: list, p: float) -> float:
+        # Nearest rank
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    def report(self, elapsed: float, players: int) -> None:
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        print(f"{players} players, {elapsed:.1f}s: {self.sessions} sessions ({self.sessions / elapsed:.1f}/s, "
+              f"{self.goals} at the goal), {requests} requests ({requests / elapsed:.0f}/s), {self.errors} errors")
+        width = max([len(request) for request in self.latencies] + [7])
+        print(f"{'request':<{width}}{'count':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for request, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            print(f"{request:<{width}}{len(latencies):>9}"
+                  + "".join(f"{Stats.percentile(latencies, p) * 1000:>9.2f}" for p in (50, 95, 99)))
+
+
+class Player:
+    def __init__(self, args, stats: 'Stats', rng: 'random.Random'):
+        self.args = args
+        self.stats = stats
+        self.rng = rng
+        self.reader = self.writer = None
+
+    async def request(self, line: str, request: str = None):
+        # The payload of the reply, None for an ERR
+        start = time.perf_counter()
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        reply = await self.reader.readline()
+        self.stats.add(request or line.split()[0], time.perf_counter() - start)
+        if not reply.startswith(b"OK "):
+            self.stats.errors += 1
+            return None
+        return json.loads(reply[3:])
+
+    async def think(self) -> None:
+        if self.args.think > 0:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think / 1000))
+
+    async def session(self, deadline: float) -> None:
+        # A session still playing at the deadline is closed without being counted
+        if await self.request(f"NEW {self.rng.getrandbits(63)}") is None:
+            return
+        for _ in range(self.args.steps):
+            if time.perf_counter() >= deadline:
+                await self.request("CLOSE")
+                return
+            ops = await self.request("OPS")
+            if not ops:
+                break
+            await self.think()
+            i, name = self.rng.choice(ops)
+            reply = await self.request(f"APPLY {i}", f"APPLY {name}")
+            if reply is None:
+                break
+            if reply["goal"]:
+                self.stats.goals += 1
+                break
+        await self.request("STATE")
+        await self.request("CLOSE")
+        self.stats.sessions += 1
+
+    async def run(self, start: float, deadline: float) -> None:
+        await asyncio.sleep(max(0., start - time.perf_counter()))
+        if self.args.unix:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.args.unix)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.args.host, self.args.port)
+        try:
+            while time.perf_counter() < deadline:
+                await self.session(deadline)
+        finally:
+            self.writer.close()
+
+
+async def run(args) -> None:
+    stats = Stats()
+    rng = random.Random(args.seed)
+    begin = time.perf_counter()
+    deadline = begin + args.ramp + args.duration
+    players = [Player(args, stats, random.Random(rng.getrandbits(64))) for _ in range(args.players)]
+    results = await asyncio.gather(*(player.run(begin + args.ramp * ind / args.players, deadline)
+                                     for ind, player in enumerate(players)), return_exceptions=True)
+    failed = [result for result in results if isinstance(result, BaseException)]
+    if failed:
+        print(f"{len(failed)} players failed, first: {failed[0]!r}")
+    stats.report(time.perf_counter() - begin, args.players)
+
+
+def spawn(args) -> 'subprocess.Popen':
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOLUZION_Server.py"), args.problem,
+               "--max-sessions", str(args.players * 2)]
+    command += ["--unix", args.unix] if args.unix else ["--host", args.host, "--port", str(args.port)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    print(server.stdout.readline().strip())  # The server is listening once it says so
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator and latency benchmark for SOLUZION_Server.py")
+    parser.add_argument("--players", type=int, default=1000, help="concurrent players, one connection each")
+    parser.add_argument("--duration", type=float, default=10., help="seconds to play after the ramp")
+    parser.add_argument("--steps", type=int, default=100, help="moves of a session at most")
+    parser.add_argument("--think", type=float, default=0., help="mean milliseconds a player waits before a move")
+    parser.add_argument("--ramp", type=float, default=1., help="seconds over which the players start")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7890)
+    parser.add_argument("--unix", help="path of the server's Unix socket instead of TCP")
+    parser.add_argument("--spawn", action="store_true", help="start the server for the run")
+    parser.add_argument("--problem", default="InfoFlow", help="problem of the spawned server")
+    args = parser.parse_args(argv)
+    if not args.unix and not is_loopback(args.host):
+        parser.error(f"{args.host} is not a loopback address")
+
+    server = spawn(args) if args.spawn else None
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,367 @@
+#!/usr/bin/python3
+"""InfoFlow_Miner.py
+ Routes of the Miner challenge: the walks from a position to the destination
+ that add the most points to the submit score.
+
+ search_route() is a best-first branch and bound over the positions and the
+ cells collected on the way, bounded by MinerRouteBound; it proves its
+ route optimal when it finishes within node_budget, and otherwise returns
+ the best walk it found. monotone_route() and greedy_route() are the quick
+ walks it starts from, and what a node_budget of 0 returns. The default
+ node_budget of 20000 keeps a route within about a second for the players
+ and the policies that ask for one on every move, on maps of any size;
+ InfoFlow_Benchmark.py miner passes a larger one to prove more routes.
+ MinerChallenge.best_route() calls into this module and caches the routes,
+ so only the clients that ask for a route load it.
+"""
+from heapq import heapify, heappush, heappop
+
+from InfoFlow import MinerChallenge
+
+
+class MinerRoute:
+    """A walk of a Miner challenge from a position to the destination: its moves as (x, y) offsets, the points they
+    add to the submit score, whether the search proved no walk scores more, and the nodes the search expanded."""
+
+    __slots__ = ("gain", "moves", "optimal", "nodes")
+
+    def __init__(self, gain: int, moves: tuple, optimal: bool, nodes: int):
+        self.gain = gain
+        self.moves = moves
+        self.optimal = optimal
+        self.nodes = nodes
+
+    def __str__(self):
+        return f"{'Optimal' if self.optimal else 'Best found'} route of {len(self.moves)} moves for {self.gain:+} points ({self.nodes} nodes)"
+
+
+class MinerRouteBound:
+    """Upper bounds on the points a walk of a Miner map can still add on its way from a position to the destination,
+    given the cells it has collected as a bit mask of their indices, for search_route().
+
+    Every step of the rest of the walk leaves a cell and enters another, so it is charged half at each end: a useful
+    cell adds at most its points minus half the steps to its two nearest other ends (useful cells not collected yet,
+    the position or the destination). The useless cells to cross are counted over the zones, the regions of the map
+    without useless cells: the walk has to join the zones of the useful cells it collects to the region it has walked
+    and to the zone of the destination. The fewest useless cells joining every set of zones come from node-weighted
+    Steiner trees over the zones and the useless cells (Dreyfus-Wagner, in 3^zones), computed once per map while
+    max_steiner_work allows it; maps of more zones only count the steps to the useful cells. Maps of more than max_cells
+    cells, larger than the game makes, only count a step per useful cell, which costs the least per walk."""
+
+    max_cells = 100
+    max_steiner_work = 3000000  # 3^zones to reach × (zones + useless cells)
+
+    __slots__ = ("n", "start", "dest", "cells", "useful_bits", "nearest", "ends_of", "zone_bits", "dest_bit", "node",
+                 "weight", "neighbours", "trees", "joined_of")
+
+    def __init__(self, map: bytes, map_size: int, start: int):
+        n, useless = map_size, MinerChallenge.USELESS
+        self.n, self.start, self.dest = n, start, n * n - 1
+        self.cells = [i for i in range(n * n) if map[i] == MinerChallenge.USEFUL]
+        self.useful_bits = sum(1 << cell for cell in self.cells)
+        self.nearest = self.trees = None
+        if n * n > MinerRouteBound.max_cells:
+            return
+        # Useful cell -> (steps, other useful cell or the destination), the nearest first
+        self.nearest = {cell: sorted((abs(cell % n - other % n) + abs(cell // n - other // n), other)
+                                     for other in self.cells + [self.dest] if other != cell) for cell in self.cells}
+        self.ends_of = {}  # Useful cells collected -> ends()
+        self.joined_of = {}  # Useless cells collected -> joined()
+
+        # Nodes of the Steiner trees: the zones, then the useless cells, weighing the useless cells they hold
+        neighbours = [[i + off_y * n + off_x for off_x, off_y in MinerChallenge.offsets
+                       if 0 <= i % n + off_x < n and 0 <= i // n + off_y < n] for i in range(n * n)]
+        self.node = node = [-1] * (n * n)
+        zones = 0
+        for first in range(n * n):
+            if map[first] != useless and node[first] < 0:
+                node[first], stack = zones, [first]
+                while stack:
+                    for j in neighbours[stack.pop()]:
+                        if map[j] != useless and node[j] < 0:
+                            node[j] = zones
+                            stack.append(j)
+                zones += 1
+        useless_cells = [i for i in range(n * n) if map[i] == useless]
+        for ind, cell in enumerate(useless_cells):
+            node[cell] = zones + ind
+        self.weight = [0] * zones + [1] * len(useless_cells)
+        self.neighbours = [set() for _ in self.weight]  # Node -> adjacent nodes
+        for i in range(n * n):
+            self.neighbours[node[i]].update(node[j] for j in neighbours[i] if node[j] != node[i])
+        # The zones the walk may have to reach, one bit each
+        terms = sorted({node[start], node[self.dest]} | {node[cell] for cell in self.cells})
+        self.zone_bits = {zone: 1 << ind for ind, zone in enumerate(terms)}
+        self.dest_bit = self.zone_bits[node[self.dest]]
+        if map[start] != useless and 3 ** len(terms) * len(self.weight) <= MinerRouteBound.max_steiner_work:
+            self.trees = self.steiner_trees(terms)
+
+    def relax(self, fewest: list) -> list:
+        # Dijkstra from every node at once, entering a node costs its weight
+        heap = [(count, v) for v, count in enumerate(fewest) if count < len(fewest)]
+        heapify(heap)
+        while heap:
+            count, v = heappop(heap)
+            if count == fewest[v]:
+                for u in self.neighbours[v]:
+                    if count + self.weight[u] < fewest[u]:
+                        fewest[u] = count + self.weight[u]
+                        heappush(heap, (fewest[u], u))
+        return fewest
+
+    def steiner_trees(self, terms: list) -> list:
+        # trees[D][v]: fewest useless cells in a connected set of nodes holding v and the zones of the bits of D
+        trees = [None] * (1 << len(terms))
+        for ind, zone in enumerate(terms):
+            fewest = [len(self.weight)] * len(self.weight)
+            fewest[zone] = 0
+            trees[1 << ind] = self.relax(fewest)
+        for bits in range(1, len(trees)):
+            if trees[bits] is None:
+                fewest = [len(self.weight)] * len(self.weight)
+                part = (bits - 1) & bits
+                while part:
+                    if part & (bits & -bits):  # Each split once, as the part holding the lowest bit
+                        for v, (one, other) in enumerate(zip(trees[part], trees[bits ^ part])):
+                            if one + other - self.weight[v] < fewest[v]:
+                                fewest[v] = one + other - self.weight[v]
+                    part = (part - 1) & bits
+                trees[bits] = self.relax(fewest)
+        return trees
+
+    def joined(self, useless_collected: int) -> tuple:
+        # (bits of the zones the walk may have reached, fewest useless cells joining the reached region and the zones
+        # of every other set of bits). The walk has been everywhere in its start zone and on its collected useless
+        # cells, and can only have entered another zone from one of these, so the region holds all of them.
+        found = self.joined_of.get(useless_collected)
+        if found is None:
+            region, reached = {self.node[self.start]}, self.zone_bits[self.node[self.start]]
+            for cell in range(self.n * self.n):
+                if useless_collected >> cell & 1:
+                    region.add(self.node[cell])
+                    for zone in self.neighbours[self.node[cell]]:
+                        if self.weight[zone] == 0:
+                            region.add(zone)
+                            reached |= self.zone_bits.get(zone, 0)
+            others = (len(self.trees) - 1) & ~reached
+            fewest = [0] * len(self.trees)
+            bits = 0
+            while True:
+                # The subsets of others in increasing order
+                bits = (bits - others) & others
+                if not bits:
+                    break
+                # Either one tree from the region to every zone of bits, or a split of them between two
+                trees = self.trees[bits]
+                count = min(trees[v] - self.weight[v] for v in region)
+                part = (bits - 1) & bits
+                while part:
+                    if part & (bits & -bits) and fewest[part] + fewest[bits ^ part] < count:
+                        count = fewest[part] + fewest[bits ^ part]
+                    part = (part - 1) & bits
+                fewest[bits] = count
+            found = self.joined_of[useless_collected] = reached, fewest
+        return found
+
+    def ends(self, useful_collected: int) -> list:
+        # (column, row, steps to its nearest and second nearest end but the position, steps to the destination, bit of
+        # its zone) of every useful cell not collected yet
+        found = self.ends_of.get(useful_collected)
+        if found is None:
+            n, dest, found = self.n, self.dest, []
+            for cell in self.cells:
+                if not useful_collected >> cell & 1:
+                    near = []
+                    for steps, other in self.nearest[cell]:
+                        if other == dest or not useful_collected >> other & 1:
+                            near.append(steps)
+                            if len(near) == 2:
+                                break
+                    found.append((cell % n, cell // n, near[0], near[1] if len(near) > 1 else 2 * n,
+                                  2 * (n - 1) - cell % n - cell // n, self.zone_bits[self.node[cell]]))
+            self.ends_of[useful_collected] = found
+        return found
+
+    def upper_bound(self, g: int, position: int, collected: int, useful_left: int) -> float:
+        points, step = MinerChallenge.points_of_cell, MinerChallenge.points_of_step
+        useful_points = points[MinerChallenge.USEFUL]
+        col, row = position % self.n, position // self.n
+        to_dest = 2 * (self.n - 1) - col - row
+        # At least a step per useful cell and one more, and the steps to the destination
+        simple = g + useful_left * useful_points + step * max(to_dest, useful_left + 1)
+        if self.nearest is None:
+            return simple
+        first_step = last_step = to_dest
+        zone_points = {}
+        for cell_col, cell_row, first, second, cell_to_dest, bit in self.ends(collected & self.useful_bits):
+            steps = abs(col - cell_col) + abs(row - cell_row)
+            if steps < first_step:
+                first_step = steps
+            if cell_to_dest < last_step:
+                last_step = cell_to_dest
+            if steps < first:
+                first, second = steps, first
+            elif steps < second:
+                second = steps
+            value = useful_points + step * (first + second) / 2
+            if value > 0:
+                zone_points[bit] = zone_points.get(bit, 0) + value
+        # The first and the last step of the walk only have one end among the useful cells
+        bound = g + step * (first_step + last_step) / 2
+        if self.trees is None:
+            return min(simple, bound + sum(zone_points.values()))
+        reached, fewest = self.joined(collected & ~self.useful_bits)
+        # Most points over the sets of zones left to reach, each less the useless cells joining it
+        useless_points = points[MinerChallenge.USELESS]
+        sums, bits = [0], [self.dest_bit & ~reached]
+        best = useless_points * fewest[bits[0]]
+        for bit, value in zone_points.items():
+            if reached & bit:
+                bound += value
+                continue
+            for ind in range(len(sums)):
+                sums.append(sums[ind] + value)
+                bits.append(bits[ind] | bit)
+                if sums[-1] + useless_points * fewest[bits[-1]] > best:
+                    best = sums[-1] + useless_points * fewest[bits[-1]]
+        return min(simple, bound + best)
+
+
+def monotone_route(map: bytes, map_size: int, x: int, y: int) -> 'MinerRoute':
+    # Best walk going only east and south, by dynamic programming from the destination back to (x, y) in O(n²)
+    n, points, step = map_size, MinerChallenge.points_of_cell, MinerChallenge.points_of_step
+    gain, next_move = {n * n - 1: 0}, {}
+    for row in range(n - 1, y - 1, -1):
+        for col in range(n - 1, x - 1, -1):
+            index = row * n + col
+            if index == n * n - 1:
+                continue
+            for off_x, off_y in ((1, 0), (0, 1)):
+                if col + off_x < n and row + off_y < n:
+                    following = index + off_y * n + off_x
+                    g = step + points[map[following]] + gain[following]
+                    if index not in gain or g > gain[index]:
+                        gain[index], next_move[index] = g, (off_x, off_y)
+    index, moves = y * n + x, []
+    while index != n * n - 1:
+        off_x, off_y = next_move[index]
+        moves.append((off_x, off_y))
+        index += off_y * n + off_x
+    return MinerRoute(gain[y * n + x], tuple(moves), False, 0)
+
+
+def greedy_route(map: bytes, map_size: int, x: int, y: int) -> 'MinerRoute':
+    # Walk the cheapest path to the nearest useful cell while it is worth its points, otherwise step east or south
+    # towards the destination. Each lookup stops within the points of one cell, so it is fast on any map size.
+    n, dest, points, step = map_size, map_size * map_size - 1, MinerChallenge.points_of_cell, MinerChallenge.points_of_step
+    map, position, gain, moves = bytearray(map), y * map_size + x, 0, []
+
+    def cost_of(cell):
+        return -step - (points[map[cell]] if map[cell] != MinerChallenge.USEFUL else 0)
+
+    def path_to_useful():
+        # Dijkstra from position, never through the destination, up to the first useful cell cheaper than its points
+        cost, previous, heap = {position: 0}, {}, [(0, position)]
+        while heap:
+            c, cell = heappop(heap)
+            if c > cost[cell]:
+                continue
+            if map[cell] == MinerChallenge.USEFUL:
+                path = []
+                while cell != position:
+                    path.append(cell)
+                    cell = previous[cell]
+                return path[::-1]
+            col, row = cell % n, cell // n
+            for off_x, off_y in MinerChallenge.offsets:
+                if 0 <= col + off_x < n and 0 <= row + off_y < n:
+                    following = cell + off_y * n + off_x
+                    following_cost = c + cost_of(following)
+                    if following != dest and following_cost < min(cost.get(following, following_cost + 1), points[MinerChallenge.USEFUL]):
+                        cost[following], previous[following] = following_cost, cell
+                        heappush(heap, (following_cost, following))
+        return None
+
+    while position != dest:
+        path = path_to_useful()
+        if not path:
+            col, row = position % n, position // n
+            towards = [cell for cell, possible in ((position + 1, col + 1 < n), (position + n, row + 1 < n)) if possible]
+            path = [min(towards, key=cost_of)]
+        for cell in path:
+            moves.append((cell % n - position % n, cell // n - position // n))
+            gain += points[map[cell]] + step
+            map[cell], position = MinerChallenge.BLANK, cell
+    return MinerRoute(gain, tuple(moves), False, 0)
+
+
+def search_route(map: bytes, map_size: int, x: int, y: int, node_budget: int = 20000) -> 'MinerRoute':
+    # Best-first branch and bound over (position, cells collected on the way), bounded by MinerRouteBound. The
+    # better of the monotone and the greedy walk is the first incumbent, so running out of node_budget still returns
+    # a valid route; the route is optimal once no open walk has an upper bound above the incumbent. A walk is
+    # dropped when another one reached the same position with the same useful cells collected and more points,
+    # counting the useless cells it collected that the walk did not as lost. Children are queued with the bound of
+    # their parent and get their own when they come out first, as most of them never come out.
+    n, dest, start = map_size, map_size * map_size - 1, y * map_size + x
+    if start == dest:
+        return MinerRoute(0, (), True, 0)
+    incumbent = max(monotone_route(map, map_size, x, y), greedy_route(map, map_size, x, y),
+                    key=lambda route: route.gain)
+    if node_budget <= 0:
+        return MinerRoute(incumbent.gain, incumbent.moves, False, 0)
+    best_gain, best_moves = incumbent.gain, incumbent.moves
+    points, step = MinerChallenge.points_of_cell, MinerChallenge.points_of_step
+    useful, useless = MinerChallenge.USEFUL, MinerChallenge.USELESS
+    bound_of = MinerRouteBound(map, map_size, start)
+    upper_bound, useful_bits = bound_of.upper_bound, bound_of.useful_bits
+
+    def moves_to(node):
+        moves = []
+        while trail[node][0] is not None:
+            node, move = trail[node]
+            moves.append(move)
+        return tuple(reversed(moves))
+
+    left = map.count(useful)
+    trail = [(None, None)]  # node -> (parent node, move from the parent)
+    # (position, useful cells collected as a bit mask) -> (gain, useless cells collected) of the walks reaching it
+    best_at = {}
+    heap = [(-upper_bound(0, start, 0, left), False, 0, 0, start, 0, left)]
+    nodes = 0
+    while heap:
+        bound, estimated, g, node, position, collected, left = heappop(heap)
+        if -bound <= best_gain:
+            break
+        if estimated:
+            own_bound = upper_bound(-g, position, collected, left)
+            if own_bound <= best_gain:
+                continue
+            if own_bound < -bound:
+                heappush(heap, (-own_bound, False, g, node, position, collected, left))
+                continue
+        if nodes >= node_budget:
+            return MinerRoute(best_gain, best_moves, False, nodes)
+        nodes += 1
+        g = -g
+        col, row = position % n, position // n
+        for off_x, off_y in MinerChallenge.offsets:
+            if not (0 <= col + off_x < n and 0 <= row + off_y < n):
+                continue
+            following = position + off_y * n + off_x
+            cell = 0 if collected >> following & 1 else map[following]
+            following_g = g + points[cell] + step
+            if following == dest:
+                if following_g > best_gain:
+                    best_gain, best_moves = following_g, moves_to(node) + ((off_x, off_y),)
+                continue
+            following_collected = collected | 1 << following if cell else collected
+            useless_collected = following_collected & ~useful_bits
+            reached = best_at.setdefault((following, following_collected & useful_bits), [])
+            if any(other_g + points[useless] * bin(useless_collected & ~other_useless).count("1") >= following_g
+                   for other_g, other_useless in reached):
+                continue
+            reached.append((following_g, useless_collected))
+            trail.append((node, (off_x, off_y)))
+            heappush(heap, (bound, True, -following_g, len(trail) - 1, following, following_collected,
+                            left - (cell == useful)))
+    return MinerRoute(best_gain, best_moves, True, nodes)
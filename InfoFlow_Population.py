@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+"""InfoFlow_Population.py
+ Vectorized economy simulator for many synthetic players at once (needs NumPy).
+
+ Usage:
+  python3 InfoFlow_Population.py [--players N] [--ticks T] [--seed S] [--accept A] [--decline D]
+                                 [--success P] [--cancel C] [--check K]
+
+ Money, debt, energy, difficulty level, round, score and challenge counts of
+ every player are arrays, and each tick applies one menu decision of every
+ player at once, with the rules of InfoFlow.py: paying off the debt, accepting
+ a challenge (Challenge.accept) and then passing it (set_finished), failing it
+ (set_unfinished) or canceling it (cancel), declining it (decline), or ending
+ the round (the FINISH_ROUND update). The constants are read from Challenge,
+ State and PlayerInfo. A player stops at the goal, when the debt is paid off.
+
+ The decisions are drawn from three uniforms per player and tick, which only
+ depend on the seed and the tick, so check() can replay sampled players one by
+ one through the scalar rules of InfoFlow.py and compare the results.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from InfoFlow import Challenge, State, PlayerInfo, Operator, OperatorIds, MessageDisplayState
+
+PAY, ACCEPT, DECLINE, END = 0, 1, 2, 3
+
+
+class Population:
+    def __init__(self, players: int, seed: int = 0, accept: float = .7, decline: float = .1, success=.8,
+                 cancel: float = .2, outcomes=((.75, 1.), (.25, .8))):
+        # accept/decline: chance of accepting/declining the offer (otherwise the round is ended), success: chance of
+        # passing an accepted challenge at each level (or at all levels), cancel: chance that a failed challenge is
+        # canceled rather than submitted, outcomes: (probability, completion level) of a passed challenge
+        self.n = players
+        self.seed = seed
+        self.accept = accept
+        self.decline = decline
+        self.cancel_rate = cancel
+        self.outcomes = tuple(outcomes)
+        self.success = np.broadcast_to(np.asarray(success, dtype=np.float64), (len(Challenge.challenge_rewards),)).copy()
+        self.completion_cdf = np.cumsum([probability for probability, _ in outcomes])
+        multipliers = np.asarray(Challenge.reward_completion_multiplier)
+        # Money of a passed challenge by completion outcome and level, as Challenge.set_finished computes it
+        self.rewards = np.array([[reward * multipliers[int(completion * 5)] for reward in Challenge.challenge_rewards]
+                                 for _, completion in outcomes])
+        self.max_level = len(Challenge.challenge_rewards) - 1
+        p = PlayerInfo()
+        self.max_energy = p.energy
+        self.money = np.full(players, float(p.money))
+        self.debt = np.full(players, float(p.debt))
+        self.energy = np.full(players, p.energy, dtype=np.int64)
+        self.level = np.full(players, p.difficulty_level, dtype=np.int64)
+        self.score = np.full(players, p.score, dtype=np.int64)
+        self.finished = np.zeros(players, dtype=np.int64)
+        self.unfinished = np.zeros(players, dtype=np.int64)
+        self.canceled = np.zeros(players, dtype=np.int64)
+        self.challenge_count = np.zeros(players, dtype=np.int64)
+        self.round = np.ones(players, dtype=np.int64)
+        self.done = self.debt == 0
+        self.ticks = 0
+
+    def draws(self, tick: int) -> 'np.ndarray':
+        # (3, players) uniforms of a tick: the decision, passing the challenge, and the completion or canceling
+        return np.random.default_rng([self.seed, tick]).random((3, self.n))
+
+    def tick(self) -> None:
+        u_action, u_pass, u_outcome = self.draws(self.ticks)
+        self.ticks += 1
+        active = ~self.done
+        cost = (self.level + 5) * Challenge.energy_accept_multiplier_level  # Challenge.energy_consume()
+        pay = active & (self.money > 0) & (self.debt > 0)
+        accept = active & ~pay & (self.energy >= cost) & (u_action < self.accept)
+        decline = active & ~pay & (u_action >= self.accept) & (u_action < self.accept + self.decline)
+        end = active & ~pay & ~accept & ~decline
+
+        # Pay off the debt with all the money there is
+        to_pay = np.where(pay, np.minimum(self.debt, self.money), 0.)
+        self.debt -= to_pay
+        self.money -= to_pay
+
+        # Accept, then pass, cancel or fail the challenge
+        self.energy = np.where(accept, np.maximum(self.energy - cost, 0), self.energy)
+        passed = accept & (u_pass < self.success[self.level])
+        canceled = accept & ~passed & (u_outcome < self.cancel_rate)
+        failed = accept & ~passed & ~canceled
+        outcome = np.minimum(np.searchsorted(self.completion_cdf, u_outcome, side="right"), len(self.rewards) - 1)
+        self.money += np.where(passed, self.rewards[outcome, self.level], 0.)
+        self.money += np.where(canceled, Challenge.money_cancel_multiplier_level * self.level, 0)
+        self.score += np.where(passed, Challenge.score_correct_multiplier_level * self.level, 0)
+        self.score += np.where(canceled, Challenge.score_cancel_multiplier_level * self.level, 0)
+        self.finished += passed
+        self.unfinished += failed
+        self.canceled += canceled
+
+        # Decline the offer
+        self.money += np.where(decline, Challenge.money_decline, 0)
+
+        self.challenge_count += passed | failed | canceled | decline
+        self.level = np.clip(self.level + passed - failed - decline, 0, self.max_level)
+
+        # End the round
+        self.energy = np.where(end, np.minimum(self.energy + State.energy_recovered_per_round, self.max_energy), self.energy)
+        self.debt = np.where(end, np.floor(self.debt * State.debt_growth_per_round), self.debt)
+        self.round += end
+
+        self.done |= self.debt == 0
+
+    def run(self, ticks: int) -> 'Population':
+        for _ in range(ticks):
+            if self.done.all():
+                break
+            self.tick()
+        return self
+
+    def player(self, i: int) -> dict:
+        return {"money": float(self.money[i]), "debt": float(self.debt[i]), "energy": int(self.energy[i]),
+                "level": int(self.level[i]), "score": int(self.score[i]), "finished": int(self.finished[i]),
+                "unfinished": int(self.unfinished[i]), "canceled": int(self.canceled[i]),
+                "challenge_count": int(self.challenge_count[i]), "round": int(self.round[i]), "done": bool(self.done[i])}
+
+    def summary(self) -> dict:
+        rounds = self.round[self.done]
+        return {"players": self.n, "ticks": self.ticks, "win_rate": float(self.done.mean()),
+                "rounds_to_goal": {q: float(np.percentile(rounds, q)) for q in (10, 50, 90)} if len(rounds) else {},
+                "money": float(self.money.mean()), "debt": float(self.debt.mean()), "score": float(self.score.mean())}
+
+
+class ScalarPlayer:
+    """One player run through the rules of InfoFlow.py: the Challenge methods on a PlayerInfo, and the PAY_DEBT and
+    FINISH_ROUND transitions of a State."""
+
+    operators = {op.id: op for op in Operator.all_ops}
+
+    def __init__(self, population: 'Population'):
+        self.population = population
+        self.state = State(seed=0)
+        self.done = self.state.player.debt == 0
+
+    def apply(self, op_id: 'OperatorIds') -> None:
+        s = self.state.apply_operator(ScalarPlayer.operators[op_id])
+        while isinstance(s, MessageDisplayState):
+            self.done |= s.is_goal_state
+            s = s.continue_to
+        self.state = State(old=s)  # Back to a bare state, the menu's offer is decided by the draws
+
+    def tick(self, u_action: float, u_pass: float, u_outcome: float) -> None:
+        if self.done:
+            return
+        pop, p = self.population, self.state.player
+        challenge = Challenge("Synthetic", p.difficulty_level)
+        if p.money > 0 and p.debt > 0:
+            self.apply(OperatorIds.PAY_DEBT)
+        elif p.energy >= challenge.energy_consume() and u_action < pop.accept:
+            challenge.accept(p)
+            if u_pass < pop.success[challenge.level]:
+                outcome = min(int(np.searchsorted(pop.completion_cdf, u_outcome, side="right")), len(pop.rewards) - 1)
+                challenge.set_finished(p, pop.outcomes[outcome][1])
+            elif u_outcome < pop.cancel_rate:
+                challenge.cancel(p)
+            else:
+                challenge.set_unfinished(p)
+        elif pop.accept <= u_action < pop.accept + pop.decline:
+            challenge.decline(p)
+        else:
+            self.apply(OperatorIds.FINISH_ROUND)
+        self.done |= self.state.player.debt == 0
+
+    def stats(self) -> dict:
+        p = self.state.player
+        return {"money": float(p.money), "debt": float(p.debt), "energy": int(p.energy), "level": int(p.difficulty_level),
+                "score": int(p.score), "finished": p.finished, "unfinished": p.unfinished, "canceled": p.canceled,
+                "challenge_count": p.challenge_count, "round": self.state.round, "done": bool(self.done)}
+
+
+def check(population_args: dict, ticks: int, samples: int, seed: int = 0) -> int:
+    # Runs a population and replays `samples` of its players through the scalar rules, returns the mismatches
+    population = Population(**population_args, seed=seed)
+    draws = []
+    for _ in range(ticks):
+        draws.append(population.draws(population.ticks))
+        population.tick()
+    indices = np.random.default_rng(seed).choice(population.n, size=min(samples, population.n), replace=False)
+    mismatches = 0
+    for i in indices:
+        player = ScalarPlayer(population)
+        for u in draws:
+            player.tick(*u[:, i])
+        if player.stats() != population.player(i):
+            mismatches += 1
+            print(f"player {i}: scalar {player.stats()} != vectorized {population.player(i)}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the economy of many synthetic players at once")
+    parser.add_argument("--players", type=int, default=1000000)
+    parser.add_argument("--ticks", type=int, default=200, help="menu decisions per player at most")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--accept", type=float, default=.7, help="chance of accepting an offer")
+    parser.add_argument("--decline", type=float, default=.1, help="chance of declining an offer")
+    parser.add_argument("--success", type=float, default=.8, help="chance of passing an accepted challenge")
+    parser.add_argument("--cancel", type=float, default=.2, help="chance of canceling a failed challenge")
+    parser.add_argument("--check", type=int, default=0, help="players to replay through the scalar rules first")
+    args = parser.parse_args(argv)
+    population_args = {"accept": args.accept, "decline": args.decline, "success": args.success, "cancel": args.cancel}
+
+    if args.check:
+        mismatches = check({"players": min(args.players, 10000), **population_args}, args.ticks, args.check, args.seed)
+        print(f"scalar check: {mismatches} of {args.check} players differ")
+        if mismatches:
+            return 1
+    start = time.perf_counter()
+    population = Population(args.players, args.seed, **population_args).run(args.ticks)
+    elapsed = time.perf_counter() - start
+    summary = population.summary()
+    print(f"{summary['players']} players, {summary['ticks']} ticks in {elapsed:.2f}s "
+          f"({summary['players'] * summary['ticks'] / elapsed / 1e6:.1f}M player-ticks/s)")
+    print(f"win rate {summary['win_rate']:.1%}, rounds to goal (p10/p50/p90): "
+          + "/".join(f"{r:g}" for r in summary["rounds_to_goal"].values()))
+    print(f"mean money {summary['money']:.1f}, mean debt {summary['debt']:.1f}, mean score {summary['score']:.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,495 @@
+#!/usr/bin/python3
+"""InfoFlow_Save.py
+ Compact binary save files of InfoFlow games.
+
+ Usage:
+  python3 InfoFlow_Save.py FILE ...
+
+ encode(s) packs a state of any State type, with its PlayerInfo and the
+ challenge it plays (or the offer a menu has drawn), into bytes with struct,
+ and decode() unpacks them. News, myths and memory sentences are saved as their
+ ids in the content pools, Miner maps as their bytes, and the messages of a
+ MessageDisplayState as text. A GameSession (see SOLUZION_Session.py) can be
+ saved too, as its seed and moves, and is replayed when it is loaded.
+
+ A save file is a header followed by any number of records, each of them the
+ length of its body and the body:
+  header: b"IFSAVE", version (u16), sizes of the news, myths and sentences pools (3 x u32)
+  record: length (u32), body (an encoded state, or SESSION_TAG and an encoded session)
+ GameWriter appends records to a file and GameReader reads them back one at a
+ time, so a file of millions of games is written and scanned in constant
+ memory; GameReader.summaries() only unpacks the round and the player stats of
+ every record. The ids of the content are only meaningful with the same pools,
+ a file written with pools of other sizes is rejected.
+
+ Running the module prints the records of the given files by state type.
+ The save benchmark of InfoFlow_Benchmark.py compares the format with pickle.
+"""
+import struct
+import sys
+import time
+from typing import NamedTuple
+
+import InfoFlow
+from InfoFlow import (State, GameStartState, ChallengeMenuState, MessageDisplayState, Message, PlayerInfo, Challenges,
+                      NewsInformation, NewsSortingChallenge, NewsSortingChallengeState, MythBusterChallenge,
+                      MythBusterChallengeState, InstantMemChallenge, InstantMemChallengeState, MinerChallenge,
+                      MinerChallengeState, OPERATORS)
+
+MAGIC = b"IFSAVE"
+VERSION = 1
+
+# Tag of every state type, the first byte of its encoding. New types are only ever appended.
+STATE_TYPES = (GameStartState, ChallengeMenuState, NewsSortingChallengeState, MythBusterChallengeState,
+               InstantMemChallengeState, MinerChallengeState, MessageDisplayState)
+STATE_TAGS = {state_type: tag for tag, state_type in enumerate(STATE_TYPES)}
+SESSION_TAG = 0xFF
+
+# Challenge types by their index in Challenges.all
+CHALLENGE_KINDS = {challenge_type: kind for kind, (_, _, challenge_type, _) in enumerate(Challenges.all)}
+CATEGORY_IDS = {category: ind for ind, category in enumerate(NewsInformation.all_categories)}
+OPERATOR_IDS = {op: ind for ind, op in enumerate(OPERATORS)}
+NO_OPERATOR = 0xFF
+
+HEADER = struct.Struct("<6sHIII")
+LENGTH = struct.Struct("<I")
+# tag, seed, round, index of the selected operator in OPERATORS, flags: goal state, has a challenge
+STATE = struct.Struct("<BQIBB")
+# flags (see PLAYER_* and NUMBER_*), difficulty level, energy, score, finished, unfinished, canceled, challenge count, info got
+PLAYER = struct.Struct("<BBBiIIIII")
+PLAYER_SET_FINISHED, PLAYER_FINISHED, PLAYER_CHALLENGE = 16, 32, 64  # The low bits are the kinds of the money and debt
+NUMBER_INT, NUMBER_FLOAT, NUMBER_BIG = 0, 1, 2
+INT64 = struct.Struct("<q")
+FLOAT64 = struct.Struct("<d")
+CHALLENGE = struct.Struct("<BB")  # kind, level
+NEWS = struct.Struct("<HBB")  # news to sort, categories, sorted categories
+NEWS_SORTED = struct.Struct("<BH")  # category, news sorted to it
+MYTHS = struct.Struct("<HH")  # myths, guesses
+MEMORY = struct.Struct("<HHH")  # sentences, sentences to remember, remembered
+MINER = struct.Struct("<HHHHHI")  # map size, x, y, useful info collected, useless info collected, steps
+MENU = struct.Struct("<QB")  # offer seed, 1 if the offer is drawn (and follows) | 2 if it is taken from a pool
+INDEX = struct.Struct("<H")
+MEMORY_INDEX = struct.Struct("<BH")  # phase, index
+MESSAGES = struct.Struct("<BH")  # index of the selected operator, messages
+MESSAGE_SHOW_TITLE, MESSAGE_GOAL, MESSAGE_NO_TITLE, MESSAGE_NO_INFO = 1, 2, 4, 8
+SESSION = struct.Struct("<BQHII")  # SESSION_TAG, seed, snapshot_every, step, moves
+
+
+class Summary(NamedTuple):
+    state_type: type
+    round: int
+    seed: int
+    difficulty_level: int
+    energy: int
+    score: int
+    finished: int
+    challenge_count: int
+    money: float
+    debt: float
+    is_game_finished: bool
+
+
+def pool_sizes() -> tuple:
+    return (len(NewsSortingChallenge.news_collection), len(MythBusterChallenge.all_myths),
+            len(InstantMemChallenge.all_sentences))
+
+
+def pack_ints(out: bytearray, code: str, values) -> None:
+    out += struct.pack(f"<{len(values)}{code}", *values)
+
+
+def unpack_ints(code: str, count: int, data, offset: int) -> (list, int):
+    return list(struct.unpack_from(f"<{count}{code}", data, offset)), offset + count * struct.calcsize(code)
+
+
+def pack_number(out: bytearray, value) -> int:
+    # Money and debt become floats with the rewards, and the debt of a long game outgrows 64 bits: the kind of number
+    # is returned for the flags, so that a number prints the same once loaded
+    if isinstance(value, float):
+        out += FLOAT64.pack(value)
+        return NUMBER_FLOAT
+    if -1 << 63 <= value < 1 << 63:
+        out += INT64.pack(value)
+        return NUMBER_INT
+    data = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+    out += bytes((len(data),))
+    out += data
+    return NUMBER_BIG
+
+
+def unpack_number(kind: int, data, offset: int) -> (object, int):
+    if kind == NUMBER_BIG:
+        return int.from_bytes(data[offset + 1:offset + 1 + data[offset]], "little", signed=True), offset + 1 + data[offset]
+    return (FLOAT64 if kind == NUMBER_FLOAT else INT64).unpack_from(data, offset)[0], offset + 8
+
+
+def pack_text(out: bytearray, text: str) -> None:
+    data = text.encode()
+    out += LENGTH.pack(len(data))
+    out += data
+
+
+def unpack_text(data, offset: int) -> (str, int):
+    length, = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    return bytes(data[offset:offset + length]).decode(), offset + length
+
+
+def encode_player(out: bytearray, p: 'PlayerInfo') -> None:
+    numbers = bytearray()
+    flags = (pack_number(numbers, p.money) | pack_number(numbers, p.debt) << 2
+             | (PLAYER_SET_FINISHED if p.set_game_finished else 0) | (PLAYER_FINISHED if p.is_game_finished else 0)
+             | (PLAYER_CHALLENGE if p.current_challenge is not None else 0))
+    out += PLAYER.pack(flags, p.difficulty_level, p.energy, p.score, p.finished, p.unfinished, p.canceled, p.challenge_count, p.info_got)
+    out += numbers
+    if p.current_challenge is not None:
+        encode_challenge(out, p.current_challenge)
+
+
+def decode_player(data, offset: int) -> ('PlayerInfo', int):
+    flags, level, energy, score, finished, unfinished, canceled, count, info_got = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    money, offset = unpack_number(flags & 3, data, offset)
+    debt, offset = unpack_number(flags >> 2 & 3, data, offset)
+    challenge = None
+    if flags & PLAYER_CHALLENGE:
+        challenge, offset = decode_challenge(data, offset)
+    return PlayerInfo(level, score, finished, unfinished, canceled, count, money, debt, energy, info_got, challenge,
+                      bool(flags & PLAYER_SET_FINISHED), bool(flags & PLAYER_FINISHED)), offset
+
+
+def encode_news(out: bytearray, c: 'NewsSortingChallenge') -> None:
+    out += NEWS.pack(len(c.to_sort), len(c.categories), len(c.sorted))
+    pack_ints(out, "I", c.to_sort)
+    out += bytes(CATEGORY_IDS[category] for category in c.categories)
+    for category, infos in c.sorted.items():
+        out += NEWS_SORTED.pack(CATEGORY_IDS[category], len(infos))
+        pack_ints(out, "I", infos)
+
+
+def decode_news(level: int, data, offset: int) -> ('NewsSortingChallenge', int):
+    count, categories, sorted_categories = NEWS.unpack_from(data, offset)
+    to_sort, offset = unpack_ints("I", count, data, offset + NEWS.size)
+    categories = [NewsInformation.all_categories[ind] for ind in data[offset:offset + categories]]
+    offset += len(categories)
+    sorted = {}
+    for _ in range(sorted_categories):
+        category, count = NEWS_SORTED.unpack_from(data, offset)
+        sorted[NewsInformation.all_categories[category]], offset = unpack_ints("I", count, data, offset + NEWS_SORTED.size)
+    return NewsSortingChallenge(level, to_sort, categories, sorted), offset
+
+
+def encode_myths(out: bytearray, c: 'MythBusterChallenge') -> None:
+    out += MYTHS.pack(len(c.myths), len(c.guesses))
+    pack_ints(out, "I", c.myths)
+    pack_ints(out, "I", list(c.guesses))
+    out += bytes(c.guesses.values())
+
+
+def decode_myths(level: int, data, offset: int) -> ('MythBusterChallenge', int):
+    count, guesses = MYTHS.unpack_from(data, offset)
+    myths, offset = unpack_ints("I", count, data, offset + MYTHS.size)
+    guessed, offset = unpack_ints("I", guesses, data, offset)
+    guesses = dict(zip(guessed, map(bool, data[offset:offset + guesses])))
+    return MythBusterChallenge(level, myths, guesses), offset + len(guesses)
+
+
+def encode_memory(out: bytearray, c: 'InstantMemChallenge') -> None:
+    # The sentences are keyed 0 .. n - 1 in order, only their (sentence id, choice to remember) are saved
+    out += MEMORY.pack(len(c.sentences), len(c.to_remember), len(c.remembered))
+    pack_ints(out, "I", [sentence for sentence, _ in c.sentences.values()])
+    out += bytes(choice for _, choice in c.sentences.values())
+    pack_ints(out, "H", c.to_remember)
+    pack_ints(out, "H", list(c.remembered))
+    out += bytes(c.remembered.values())
+
+
+def decode_memory(level: int, data, offset: int) -> ('InstantMemChallenge', int):
+    count, to_remember, remembered = MEMORY.unpack_from(data, offset)
+    sentences, offset = unpack_ints("I", count, data, offset + MEMORY.size)
+    sentences = dict(enumerate(zip(sentences, data[offset:offset + count])))
+    to_remember, offset = unpack_ints("H", to_remember, data, offset + count)
+    indices, offset = unpack_ints("H", remembered, data, offset)
+    remembered = dict(zip(indices, data[offset:offset + remembered]))
+    return InstantMemChallenge(level, sentences, to_remember, remembered), offset + len(remembered)
+
+
+def encode_miner(out: bytearray, c: 'MinerChallenge') -> None:
+    out += MINER.pack(c.map_size, c.x, c.y, c.useful_info_collected, c.useless_info_collected, c.steps)
+    out += c.map
+
+
+def decode_miner(level: int, data, offset: int) -> ('MinerChallenge', int):
+    map_size, x, y, useful, useless, steps = MINER.unpack_from(data, offset)
+    offset += MINER.size
+    cells = map_size * map_size
+    return MinerChallenge(level, bytes(data[offset:offset + cells]), map_size, x, y, useful, useless, steps), offset + cells
+
+
+# (encoder, decoder) of every challenge type, by its index in Challenges.all
+challenge_codecs = {CHALLENGE_KINDS[NewsSortingChallenge]: (encode_news, decode_news),
+                    CHALLENGE_KINDS[MythBusterChallenge]: (encode_myths, decode_myths),
+                    CHALLENGE_KINDS[InstantMemChallenge]: (encode_memory, decode_memory),
+                    CHALLENGE_KINDS[MinerChallenge]: (encode_miner, decode_miner)}
+
+
+def encode_challenge(out: bytearray, c: 'InfoFlow.Challenge') -> None:
+    kind = CHALLENGE_KINDS[type(c)]
+    out += CHALLENGE.pack(kind, c.level)
+    challenge_codecs[kind][0](out, c)
+
+
+def decode_challenge(data, offset: int) -> ('InfoFlow.Challenge', int):
+    kind, level = CHALLENGE.unpack_from(data, offset)
+    return challenge_codecs[kind][1](level, data, offset + CHALLENGE.size)
+
+
+def encode_menu(out: bytearray, s: 'ChallengeMenuState') -> None:
+    # The offer is saved once drawn, as it may come from a ChallengePool rather than from the offer seed
+    out += MENU.pack(s.offer_seed, (s._offer is not None) | s._pooled << 1)
+    if s._offer is not None:
+        encode_challenge(out, s._offer[0])
+
+
+def decode_menu(s: 'ChallengeMenuState', data, offset: int) -> int:
+    s.offer_seed, flags = MENU.unpack_from(data, offset)
+    offset += MENU.size
+    s._offer, s._pooled = None, bool(flags & 2)
+    if flags & 1:
+        challenge, offset = decode_challenge(data, offset)
+        s._offer = challenge, Challenges.all[CHALLENGE_KINDS[type(challenge)]][1]
+    return offset
+
+
+def encode_news_index(out: bytearray, s: 'NewsSortingChallengeState') -> None:
+    out += INDEX.pack(s.news_index)
+
+
+def decode_news_index(s: 'NewsSortingChallengeState', data, offset: int) -> int:
+    s.news_index, = INDEX.unpack_from(data, offset)
+    return offset + INDEX.size
+
+
+def encode_myth_index(out: bytearray, s: 'MythBusterChallengeState') -> None:
+    out += INDEX.pack(s.myth_index)
+
+
+def decode_myth_index(s: 'MythBusterChallengeState', data, offset: int) -> int:
+    s.myth_index, = INDEX.unpack_from(data, offset)
+    return offset + INDEX.size
+
+
+def encode_memory_index(out: bytearray, s: 'InstantMemChallengeState') -> None:
+    out += MEMORY_INDEX.pack(s.phase_index, s.instant_mem_index)
+
+
+def decode_memory_index(s: 'InstantMemChallengeState', data, offset: int) -> int:
+    s.phase_index, s.instant_mem_index = MEMORY_INDEX.unpack_from(data, offset)
+    return offset + MEMORY_INDEX.size
+
+
+# (encoder, decoder) of the slots a state type adds to State, the types missing here add none
+state_codecs = {ChallengeMenuState: (encode_menu, decode_menu),
+                NewsSortingChallengeState: (encode_news_index, decode_news_index),
+                MythBusterChallengeState: (encode_myth_index, decode_myth_index),
+                InstantMemChallengeState: (encode_memory_index, decode_memory_index)}
+
+
+def operator_index(s: 'State') -> int:
+    return NO_OPERATOR if s.selected_operator is None else OPERATOR_IDS[s.selected_operator]
+
+
+def encode_messages(out: bytearray, s: 'MessageDisplayState') -> None:
+    # The messages share everything but themselves with the target, which is saved in full after them
+    out += STATE_TAGS[MessageDisplayState].to_bytes(1, "little")
+    out += MESSAGES.pack(operator_index(s), len(s.messages))
+    for message in s.messages:
+        out += bytes(((MESSAGE_SHOW_TITLE if message.show_title else 0) | (MESSAGE_GOAL if message.goal else 0)
+                      | (MESSAGE_NO_TITLE if message.title is None else 0) | (MESSAGE_NO_INFO if message.info is None else 0),))
+        pack_text(out, message.title or "")
+        pack_text(out, message.info or "")
+    encode_state(out, s.target)
+
+
+def decode_messages(data, offset: int) -> ('MessageDisplayState', int):
+    op, count = MESSAGES.unpack_from(data, offset)
+    offset += MESSAGES.size
+    messages = []
+    for _ in range(count):
+        flags = data[offset]
+        title, offset = unpack_text(data, offset + 1)
+        info, offset = unpack_text(data, offset)
+        messages.append(Message(None if flags & MESSAGE_NO_TITLE else title, None if flags & MESSAGE_NO_INFO else info,
+                                bool(flags & MESSAGE_SHOW_TITLE), bool(flags & MESSAGE_GOAL)))
+    target, offset = decode_state(data, offset)
+    s = MessageDisplayState(target, tuple(messages))
+    s.selected_operator = None if op == NO_OPERATOR else OPERATORS[op]
+    return s, offset
+
+
+def encode_state(out: bytearray, s: 'State') -> None:
+    if type(s) is MessageDisplayState:
+        encode_messages(out, s)
+        return
+    out += STATE.pack(STATE_TAGS[type(s)], s.seed, s.round, operator_index(s),
+                      (1 if s.is_goal_state else 0) | (2 if s.challenge is not None else 0))
+    encode_player(out, s.player)
+    if s.challenge is not None:
+        encode_challenge(out, s.challenge)
+    codec = state_codecs.get(type(s))
+    if codec:
+        codec[0](out, s)
+
+
+def decode_state(data, offset: int = 0) -> ('State', int):
+    if data[offset] == STATE_TAGS[MessageDisplayState]:
+        return decode_messages(data, offset + 1)
+    tag, seed, round, op, flags = STATE.unpack_from(data, offset)
+    state_type = STATE_TYPES[tag]
+    # The slots are set as saved, without the derivations of the constructors
+    s = object.__new__(state_type)
+    s.player, offset = decode_player(data, offset + STATE.size)
+    s.challenge = None
+    if flags & 2:
+        s.challenge, offset = decode_challenge(data, offset)
+    s.round = round
+    s.seed = seed
+    s.selected_operator = None if op == NO_OPERATOR else OPERATORS[op]
+    s.is_goal_state = bool(flags & 1)
+    s._applicable_op_ids = None
+    s._description = None
+    s._text = None
+    codec = state_codecs.get(state_type)
+    if codec:
+        offset = codec[1](s, data, offset)
+    return s, offset
+
+
+def encode_session(out: bytearray, session) -> None:
+    out += SESSION.pack(SESSION_TAG, session.seed, session.snapshot_every, session.step, len(session.moves))
+    pack_ints(out, "H", session.moves)
+
+
+def decode_session(data, offset: int = 0):
+    from SOLUZION_Session import GameSession
+    _, seed, snapshot_every, step, count = SESSION.unpack_from(data, offset)
+    moves, offset = unpack_ints("H", count, data, offset + SESSION.size)
+    session = GameSession.replay(InfoFlow, seed, moves, snapshot_every)
+    session.jump(step)
+    return session, offset
+
+
+def encode(obj) -> bytes:
+    # The body of a record: a State or a GameSession
+    out = bytearray()
+    if isinstance(obj, State):
+        encode_state(out, obj)
+    else:
+        encode_session(out, obj)
+    return bytes(out)
+
+
+def decode(data):
+    if data[0] == SESSION_TAG:
+        return decode_session(data)[0]
+    return decode_state(data)[0]
+
+
+def summary(data) -> 'Summary':
+    # The round and player stats of a record without building its state, those of the target of a message
+    if data[0] == SESSION_TAG:
+        s = decode_session(data)[0].state
+        p = s.player
+        return Summary(type(s), s.round, s.seed, p.difficulty_level, p.energy, p.score, p.finished, p.challenge_count,
+                       p.money, p.debt, p.is_game_finished)
+    offset = 0
+    if data[0] == STATE_TAGS[MessageDisplayState]:
+        offset += 1 + MESSAGES.size
+        for _ in range(MESSAGES.unpack_from(data, 1)[1]):
+            offset = unpack_text(data, unpack_text(data, offset + 1)[1])[1]
+    _, seed, round, _, _ = STATE.unpack_from(data, offset)
+    flags, level, energy, score, finished, _, _, count, _ = PLAYER.unpack_from(data, offset + STATE.size)
+    offset += STATE.size + PLAYER.size
+    money, offset = unpack_number(flags & 3, data, offset)
+    debt, _ = unpack_number(flags >> 2 & 3, data, offset)
+    return Summary(STATE_TYPES[data[0]], round, seed, level, energy, score, finished, count, money, debt, bool(flags & PLAYER_FINISHED))
+
+
+class GameWriter:
+    def __init__(self, file):
+        # file: a binary file open for writing, the header is written at once
+        self.file = file
+        self.count = 0
+        file.write(HEADER.pack(MAGIC, VERSION, *pool_sizes()))
+
+    def write(self, obj) -> None:
+        body = encode(obj)
+        self.file.write(LENGTH.pack(len(body)))
+        self.file.write(body)
+        self.count += 1
+
+    def write_all(self, objs) -> None:
+        for obj in objs:
+            self.write(obj)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+class GameReader:
+    def __init__(self, file):
+        # file: a binary file open for reading at the header
+        self.file = file
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not an InfoFlow save file")
+        _, self.version, *sizes = HEADER.unpack(header)
+        if self.version > VERSION:
+            raise ValueError(f"Save file version {self.version} is newer than this reader ({VERSION})")
+        if tuple(sizes) != pool_sizes():
+            raise ValueError(f"Save file written with content pools of sizes {tuple(sizes)}, not {pool_sizes()}")
+
+    def records(self):
+        # The body of every record, undecoded
+        read = self.file.read
+        while True:
+            length = read(LENGTH.size)
+            if not length:
+                return
+            if len(length) < LENGTH.size:
+                raise EOFError("Truncated record length")
+            body = read(LENGTH.unpack(length)[0])
+            if len(body) < LENGTH.unpack(length)[0]:
+                raise EOFError("Truncated record")
+            yield body
+
+    def __iter__(self):
+        return map(decode, self.records())
+
+    def summaries(self):
+        return map(summary, self.records())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+def main(argv=None):
+    for path in (sys.argv[1:] if argv is None else argv):
+        start = time.perf_counter()
+        counts = {}
+        with GameReader(open(path, "rb")) as reader:
+            for s in reader.summaries():
+                counts[s.state_type.__name__] = counts.get(s.state_type.__name__, 0) + 1
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {sum(counts.values())} records in {elapsed:.2f}s, "
+              + ", ".join(f"{count} {name}" for name, count in sorted(counts.items())))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""InfoFlow_Search.py
+ Monte Carlo tree search over the InfoFlow game loop.
+
+ GameTreeSearch(problem).best_operator(state) plans from state with UCT and
+ returns the operator it recommends. The challenge offers, and every other
+ random draw of the game, come from the seeds of the states (see
+ State.rng()), so each iteration copies the root with a fresh seed: the
+ search samples the chance outcomes instead of planning against the draws
+ already fixed in the root's descendants. As the states a sequence of
+ operators reaches differ from one sample to the next (a new offer is a new
+ state), the tree is open-loop: a node stands for the sequence of operators
+ from the root, whatever states the samples reached with it, so the samples
+ share the statistics of every node. The trees are kept in a
+ TranspositionTable keyed by the State.key() of their root, so planning from
+ a position that was planned from before goes on with its tree.
+
+ The budget is a number of iterations (each expands one node) and/or a
+ number of milliseconds, whichever runs out first; 0 or None leaves one
+ of them unlimited.
+"""
+import copy
+import math
+import time
+from random import Random
+
+
+class SearchNode:
+    __slots__ = ("visits", "total", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.  # Of the values of the iterations through the node
+        self.children = {}  # op id -> SearchNode
+
+
+class GameTreeSearch:
+    def __init__(self, problem, nodes: int = 500, ms: float = None, exploration: float = 1.4,
+                 rollout_depth: int = 20, max_depth: int = 200, table_size: int = 200000, seed: int = None):
+        if not nodes and not ms:
+            raise ValueError("The search needs a budget of nodes or milliseconds")
+        self.problem = problem
+        self.nodes = nodes or None
+        self.ms = ms
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.max_depth = max_depth
+        self.table = problem.TranspositionTable(table_size)
+        self.rng = Random(seed)
+        self.operators = {op.id: op for op in problem.OPERATORS}
+        self.expanded = 0  # Nodes expanded over all searches, for nodes per second
+        self.elapsed = 0.
+
+    @staticmethod
+    def value(state) -> float:
+        # 1 for reaching the goal in round 1, down to .5 for round 50 and later; below .5 otherwise, by net worth
+        p = state.player
+        if state.is_goal_state:
+            return 1. - min(state.round, 50) / 100
+        return .25 * (1 + math.tanh((p.money - p.debt) / 500))
+
+    def rollout_operator(self, state):
+        suggested = state.suggested_op_id(0)
+        if suggested is not None:
+            return self.operators[suggested]
+        return self.operators[self.rng.choice(tuple(state.applicable_op_ids()))]
+
+    def rollout(self, state) -> float:
+        for _ in range(self.rollout_depth):
+            if state.is_goal_state:
+                break
+            state = self.rollout_operator(state).apply(state)
+        return GameTreeSearch.value(state)
+
+    def select(self, node: 'SearchNode', state):
+        # UCT over the operators applicable in state, each unvisited one is tried first
+        log_visits = math.log(node.visits + 1)
+        best, best_score = None, -1.
+        for op_id in state.applicable_op_ids():
+            child = node.children.get(op_id)
+            if child is None:
+                return op_id
+            score = child.total / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = op_id, score
+        return best
+
+    def iterate(self, tree: 'SearchNode', root) -> None:
+        state = copy.copy(root)
+        state.seed = self.rng.getrandbits(64)
+        node, path, on_path = tree, [tree], set()
+        for _ in range(self.max_depth):
+            if state.is_goal_state:
+                value = GameTreeSearch.value(state)
+                break
+            if not node.visits and node is not tree:
+                self.expanded += 1
+                value = self.rollout(state)
+                break
+            key = state.key()
+            if key in on_path:
+                # Back at a position of this descent (e.g. paying without money): a move that goes around in a circle
+                # is worth nothing, rather than the value of the position it comes back to
+                value = 0.
+                break
+            on_path.add(key)
+            op_id = self.select(node, state)
+            node = node.children.setdefault(op_id, SearchNode())
+            path.append(node)
+            state = self.operators[op_id].apply(state)
+        else:
+            value = GameTreeSearch.value(state)
+        for node in path:
+            node.visits += 1
+            node.total += value
+
+    def best_operator(self, state):
+        ops = state.applicable_op_ids()
+        if len(ops) == 1:
+            return self.operators[next(iter(ops))]
+        start = time.perf_counter()
+        deadline = start + self.ms / 1000 if self.ms else None
+        tree = self.table.get(state)
+        if tree is None:
+            tree = SearchNode()
+            self.table.put(state, tree)
+        iterations = 0
+        while (self.nodes is None or iterations < self.nodes) and (deadline is None or time.perf_counter() < deadline):
+            self.iterate(tree, state)
+            iterations += 1
+        self.elapsed += time.perf_counter() - start
+        tried = [op_id for op_id in ops if op_id in tree.children]
+        if not tried:
+            return self.operators[self.rng.choice(tuple(ops))]
+        return self.operators[max(tried, key=lambda op_id: tree.children[op_id].visits)]
+
+    def nodes_per_second(self) -> float:
+        return self.expanded / self.elapsed if self.elapsed else 0.
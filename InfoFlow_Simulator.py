@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+"""InfoFlow_Simulator.py
+ Headless batch simulator for a problem in SOLUZION format.
+
+ Usage:
+  python3 InfoFlow_Simulator.py [--problem InfoFlow] [--policy random|first|last|suggested|economy ...]
+                                [--games N] [--seed S] [--max-steps M]
+                                [--workers W] [--chunk C] [--bin B] [--pool P]
+
+ Plays N complete games with one of the AutoPlayer policies, without Tk,
+ without sleeping and without printing every step, then reports rounds to
+ the goal, final score, money, debt and challenge counts over all games,
+ and the throughput in games per second. Game i is played with seed S + i,
+ so a run is reproducible and can be split over several processes. A game
+ that has not reached the goal after M operators is counted as unfinished.
+
+ With --workers the games are spread over a pool of W processes in jobs of
+ C seeds, each job playing a single policy, and the per-game results are
+ merged into a win rate and a score distribution per policy. The seeds of
+ the games do not depend on W or C, so the merged results do not either.
+
+ With --pool the challenges are handed out by a ChallengePool of P
+ challenges per level and type, refilled before every game in each process
+ and seeded with S, and its hits and misses are reported (in this process
+ only). The challenges then depend on the order in which the games of
+ a process ask for them, so with --workers the results depend on W and C.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from statistics import mean, median
+from typing import NamedTuple, List
+
+
+def random_policy(problem, state, legal: 'List[int]', rng: 'Random') -> int:
+    return rng.choice(legal)
+
+
+def first_policy(problem, state, legal: 'List[int]', rng: 'Random') -> int:
+    return legal[0]
+
+
+def last_policy(problem, state, legal: 'List[int]', rng: 'Random') -> int:
+    return legal[-1]
+
+
+def suggested_policy(problem, state, legal: 'List[int]', rng: 'Random') -> int:
+    import InfoFlow_Economy
+    return InfoFlow_Economy.suggested_op_index(problem.OPERATORS, state, legal, rng)
+
+
+def economy_policy(problem, state, legal: 'List[int]', rng: 'Random') -> int:
+    import InfoFlow_Economy
+    return InfoFlow_Economy.economy_op_index(problem.OPERATORS, state, legal, rng)
+
+
+# The AutoPlayer modes 0 to 5, by name (mode 4, the tree search, is benchmarked by InfoFlow_Benchmark.py search)
+POLICIES = {"random": random_policy, "first": first_policy, "last": last_policy, "suggested": suggested_policy,
+            "economy": economy_policy}
+
+
+class GameResult(NamedTuple):
+    seed: int
+    policy: str
+    won: bool
+    steps: int
+    rounds: int
+    score: int
+    money: float
+    debt: int
+    finished: int
+    unfinished: int
+    canceled: int
+    declined: int
+    challenge_count: int
+
+
+def new_game(problem, seed: int):
+    return problem.new_game(seed) if hasattr(problem, "new_game") else problem.copy_state(problem.INITIAL_STATE)
+
+
+def legal_operators(problem, state) -> 'List[int]':
+    if hasattr(state, "applicability_vector"):
+        return [i for i, applicable in enumerate(state.applicability_vector()) if applicable]
+    return [i for i, op in enumerate(problem.OPERATORS) if op.is_applicable(state)]
+
+
+def play_game(problem, policy: str, seed: int, max_steps: int = 2000) -> 'GameResult':
+    choose, rng = POLICIES[policy], Random(seed)
+    operators = problem.OPERATORS
+    state, steps, won = new_game(problem, seed), 0, False
+    while steps < max_steps:
+        if problem.goal_test(state):
+            won = True
+            break
+        state = operators[choose(problem, state, legal_operators(problem, state), rng)].apply(state)
+        steps += 1
+    p = state.player
+    return GameResult(seed=seed, policy=policy, won=won, steps=steps, rounds=state.round, score=p.score,
+                      money=p.money, debt=p.debt, finished=p.finished, unfinished=p.unfinished, canceled=p.canceled,
+                      declined=p.challenge_count - p.finished - p.unfinished - p.canceled,
+                      challenge_count=p.challenge_count)
+
+
+def simulate(problem, policy: str, games: int, seed: int = 0, max_steps: int = 2000) -> 'List[GameResult]':
+    # An installed challenge pool is filled before every game rather than while it is played
+    pool = getattr(getattr(problem, "ChallengePool", None), "installed", None)
+    results = []
+    for i in range(games):
+        if pool is not None:
+            pool.fill()
+        results.append(play_game(problem, policy, seed + i, max_steps))
+    return results
+
+
+# The problem module of a worker process, imported once by its initializer rather than pickled with every job
+_worker_problem = None
+
+
+def _init_worker(problem_name: str, pool: int = 0, seed: int = 0):
+    global _worker_problem
+    _worker_problem = importlib.import_module(problem_name)
+    if pool:
+        _worker_problem.ChallengePool(pool, seed).install()
+
+
+def _run_job(policy: str, seed: int, games: int, max_steps: int) -> 'List[GameResult]':
+    return simulate(_worker_problem, policy, games, seed, max_steps)
+
+
+def simulate_parallel(problem_name: str, policies: 'List[str]', games: int, seed: int = 0, max_steps: int = 2000,
+                      workers: int = None, chunk: int = None, pool: int = 0) -> dict:
+    # Every policy plays the same seeds, seed .. seed + games - 1, in jobs of chunk consecutive seeds
+    workers = workers or os.cpu_count()
+    chunk = chunk or max(1, min(64, games // (workers * 4)))
+    results = {policy: [] for policy in policies}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(problem_name, pool, seed)) as executor:
+        jobs = [(policy, executor.submit(_run_job, policy, seed + start, min(chunk, games - start), max_steps))
+                for policy in policies for start in range(0, games, chunk)]
+        for policy, job in jobs:
+            results[policy] += job.result()
+    return results
+
+
+def score_histogram(results: 'List[GameResult]', width: int = 100) -> 'List[tuple]':
+    # (lower bound of the bin, number of games) for the non-empty bins of the final scores
+    counts = Counter(r.score // width * width for r in results)
+    return sorted(counts.items())
+
+
+def distribution(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {}
+    return {"min": values[0], "median": median(values), "mean": mean(values), "max": values[-1]}
+
+
+def summarize(results: 'List[GameResult]') -> dict:
+    won = [r for r in results if r.won]
+    return {"games": len(results),
+            "won": len(won),
+            "win_rate": len(won) / len(results) if results else 0.,
+            "rounds_to_goal": distribution(r.rounds for r in won),
+            "steps": distribution(r.steps for r in results),
+            "score": distribution(r.score for r in results),
+            "money": distribution(r.money for r in results),
+            "debt": distribution(r.debt for r in results),
+            "finished": sum(r.finished for r in results),
+            "unfinished": sum(r.unfinished for r in results),
+            "canceled": sum(r.canceled for r in results),
+            "declined": sum(r.declined for r in results),
+            "challenge_count": sum(r.challenge_count for r in results)}
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"games: {summary['games']}  won: {summary['won']}  win rate: {summary['win_rate']:.1%}"]
+    for name in ("rounds_to_goal", "steps", "score", "money", "debt"):
+        d = summary[name]
+        lines.append(f"{name:>15}: " + ("-" if not d else
+                                       f"min {d['min']:g}  median {d['median']:g}  mean {d['mean']:.1f}  max {d['max']:g}"))
+    # challenge_count counts every offer played or declined
+    lines.append(f"     challenges: {summary['challenge_count'] - summary['declined']} accepted, {summary['finished']} finished, "
+                 f"{summary['unfinished']} unfinished, {summary['canceled']} canceled, {summary['declined']} declined")
+    return "\n".join(lines)
+
+
+def format_histogram(histogram: 'List[tuple]', width: int = 100, bar: int = 40) -> str:
+    top = max((count for _, count in histogram), default=0)
+    return "\n".join(f"{low:>8} .. {low + width - 1:<8}{count:>7} {'#' * max(1, count * bar // top)}" for low, count in histogram)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many games headless and report aggregate statistics")
+    parser.add_argument("--problem", default="InfoFlow", help="module name of the problem formulation")
+    parser.add_argument("--policy", choices=sorted(POLICIES), nargs="+", default=["random"])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=2000, help="operators after which a game counts as unfinished")
+    parser.add_argument("--workers", type=int, default=0, help="processes to play the games in, 0 plays them in this process")
+    parser.add_argument("--chunk", type=int, default=0, help="games per job sent to a worker process")
+    parser.add_argument("--bin", type=int, default=100, help="width of the bins of the score distribution")
+    parser.add_argument("--pool", type=int, default=0, help="challenges per level and type to build ahead of time")
+    args = parser.parse_args(argv)
+
+    problem = importlib.import_module(args.problem)
+    pool = problem.ChallengePool(args.pool, args.seed).install() if args.pool and not args.workers else None
+    start = time.perf_counter()
+    if args.workers:
+        results = simulate_parallel(args.problem, args.policy, args.games, args.seed, args.max_steps, args.workers,
+                                    args.chunk, args.pool)
+    else:
+        results = {policy: simulate(problem, policy, args.games, args.seed, args.max_steps) for policy in args.policy}
+    elapsed = time.perf_counter() - start
+    for policy in args.policy:
+        print(f"{problem.PROBLEM_NAME}; policy {policy}")
+        print(format_summary(summarize(results[policy])))
+        if args.workers:
+            print(format_histogram(score_histogram(results[policy], args.bin), args.bin))
+    played = args.games * len(args.policy)
+    print(f"{played} games in {elapsed:.2f}s: {played / elapsed:.1f} games/s"
+          + (f" on {args.workers} worker processes" if args.workers else ""))
+    if pool is not None:
+        print(f"challenge pool: {pool.hits} hits, {pool.misses} misses")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
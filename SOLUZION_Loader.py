@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""SOLUZION_Loader.py
+ Loads a SOLUZION problem formulation (and its visualization) once per
+ process for the clients.
+
+ load_problem("InfoFlow") runs InfoFlow.py exactly once and registers it in
+ sys.modules before running it, so a later "import InfoFlow", such as the
+ "from InfoFlow import *" of the VIS module, gets the same module instead
+ of running the file again.
+
+ The tables the formulation builds at import time can be kept between
+ launches: the module gets a TableCache as TABLE_CACHE before it runs, and
+ builds a table with TABLE_CACHE.get(name, build), which unpickles the table
+ saved by the last launch or calls build() and saves the result. The cache
+ is a pickle in __pycache__, versioned and keyed by the SHA-256 of the
+ source file, so editing the file rebuilds it.
+
+ report_first_state() prints the time from the import of this module (the
+ start of the client) to its first state.
+"""
+import hashlib
+import importlib.util
+import os
+import pickle
+import sys
+import time
+
+STARTED = time.perf_counter()
+LOAD_TIMES = {}  # Module name -> seconds it took to load
+
+
+class TableCache:
+    version = 1
+
+    def __init__(self, path: str, source_hash: str):
+        self.path = path
+        self.source_hash = source_hash
+        self.tables = {}  # Name -> pickled table
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+            if saved["version"] == TableCache.version and saved["source_hash"] == source_hash:
+                self.tables = saved["tables"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+            pass
+
+    def get(self, name: str, build):
+        if name in self.tables:
+            try:
+                table = pickle.loads(self.tables[name])
+                self.hits += 1
+                return table
+            except Exception:  # A table of classes that changed shape, built again below
+                pass
+        self.misses += 1
+        table = build()
+        try:
+            self.tables[name] = pickle.dumps(table, pickle.HIGHEST_PROTOCOL)
+            self.dirty = True
+        except Exception:  # Not picklable, simply built on every launch
+            pass
+        return table
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                pickle.dump({"version": TableCache.version, "source_hash": self.source_hash, "tables": self.tables}, f,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+            self.dirty = False
+        except OSError:  # A read-only checkout still loads, just without the cache
+            pass
+
+
+def find_source(name: str, directory: str = None) -> str:
+    # name.py in directory (this module's by default), matched case-insensitively if needed, as the clients ask
+    # for e.g. InfoFlow_Array_VIS_FOR_TK.py
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(directory, name + ".py")
+    if os.path.exists(path):
+        return path
+    for file in os.listdir(directory):
+        if file.lower() == (name + ".py").lower():
+            return os.path.join(directory, file)
+    raise ImportError(f"No module file {name}.py in {directory}")
+
+
+def load_module(name: str, path: str = None, cache_tables: bool = False):
+    # The module of the given name, run from its file the first time it is asked for
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    path = path or find_source(name)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    cache = None
+    if cache_tables:
+        with open(path, "rb") as f:
+            source_hash = hashlib.sha256(f.read()).hexdigest()
+        cache = module.TABLE_CACHE = TableCache(
+            os.path.join(os.path.dirname(path), "__pycache__", f"{name}.tables.pickle"), source_hash)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    if cache is not None:
+        cache.save()
+    LOAD_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+def load_problem(name: str, path: str = None):
+    return load_module(name, path, cache_tables=True)
+
+
+def report_first_state(problem) -> None:
+    cache = getattr(problem, "TABLE_CACHE", None)
+    tables = f", {cache.hits} tables from the cache and {cache.misses} built" if cache is not None else ""
+    loads = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in LOAD_TIMES.items())
+    print(f"Time to first state: {(time.perf_counter() - STARTED) * 1000:.0f} ms (loaded {loads}{tables})")
@@ -0,0 +1,280 @@
+#!/usr/bin/python3
+"""SOLUZION_Server.py
+ Hosts many game sessions of a SOLUZION problem formulation in one process,
+ over a line protocol on a loopback TCP port or a Unix socket.
+
+ Usage:
+  python3 SOLUZION_Server.py [PROBLEM] [--host H] [--port P | --unix PATH] [--max-sessions N] [--idle SECONDS]
+
+ Every request is one line of words and gets one reply line, "OK " and a JSON
+ value, or "ERR " and a reason:
+  NEW [SEED]     starts a session (see SOLUZION_Session.GameSession) and uses it
+                 -> {"session": id, "seed": seed}
+  OPEN ID        uses a session started by another connection -> {"session": id, "seed": seed, "step": step}
+  OPS            -> [[index, name], ...] of the operators applicable to the current state
+  APPLY INDEX    applies the operator of that index in OPERATORS -> {"step": step, "goal": goal}
+  STATE          -> {"step": step, "goal": goal, "text": str(state)}, with "message" (GOAL_MESSAGE_FUNCTION) at a goal
+  UNDO, REDO     -> {"step": step, "moved": whether there was a step to undo or redo}
+  CLOSE          ends the session -> {"session": id}
+  STATS          -> {"sessions": ..., "connections": ..., "evicted": ..., "requests": ...}
+  QUIT           closes the connection
+ A connection handles its requests one at a time, so a client may send
+ several before reading the replies.
+
+ Everything runs in one asyncio event loop, and a session is only touched
+ between two awaits, so sessions need no locks. A connection waits for its
+ reply to drain before it reads its next request: a client that does not read
+ its replies stops being served, instead of growing the server's buffers.
+ Requests are limited to MAX_LINE bytes. A request that fails with an
+ unexpected exception is answered "ERR internal error" and its traceback
+ goes to stderr. Sessions unused for --idle seconds are evicted, and
+ connections idle for as long are closed. Past --max-sessions, NEW is
+ refused until a session ends or is evicted.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import socket
+import stat
+import sys
+import traceback
+
+import SOLUZION_Loader
+from SOLUZION_Session import GameSession
+
+MAX_LINE = 4096
+WRITE_BUFFER = 64 * 1024  # Bytes of replies buffered for a connection before it stops reading requests
+
+
+class RequestError(Exception):
+    pass
+
+
+def is_loopback(host: str) -> bool:
+    # Whether every address of host is a loopback one, as the server listens on all of them, False if it does not
+    # resolve. getaddrinfo also resolves IPv6 hosts such as ::1, which gethostbyname refuses.
+    try:
+        addresses = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(address[4][0]).is_loopback for address in addresses)
+
+
+class ServerSession:
+    __slots__ = ("id", "game", "last_used")
+
+    def __init__(self, id: int, game: 'GameSession', now: float):
+        self.id = id
+        self.game = game
+        self.last_used = now
+
+
+class SessionServer:
+    def __init__(self, problem, max_sessions: int = 10000, idle_timeout: float = 300., snapshot_every: int = 32):
+        self.problem = problem
+        self.operators = problem.OPERATORS
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.snapshot_every = snapshot_every
+        self.sessions = {}  # Id -> ServerSession, the least recently used first
+        self.next_id = 1
+        self.connections = 0
+        self.evicted = 0
+        self.requests = 0
+        self.commands = {"NEW": self.new, "OPEN": self.open, "OPS": self.ops, "APPLY": self.apply, "STATE": self.state,
+                         "UNDO": self.undo, "REDO": self.redo, "CLOSE": self.close, "STATS": self.stats}
+
+    def now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def evict_idle(self) -> None:
+        deadline = self.now() - self.idle_timeout
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_used > deadline:
+                break
+            del self.sessions[session.id]
+            self.evicted += 1
+
+    async def evict_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self.evict_idle()
+
+    def touch(self, session: 'ServerSession') -> None:
+        # Moves the session to the end of the order of use
+        session.last_used = self.now()
+        del self.sessions[session.id]
+        self.sessions[session.id] = session
+
+    def attached(self, connection: dict) -> 'ServerSession':
+        session = self.sessions.get(connection.get("session"))
+        if session is None:
+            raise RequestError("no session, start one with NEW" if "session" not in connection else "the session has ended")
+        self.touch(session)
+        return session
+
+    @staticmethod
+    def integer(args: list, name: str) -> int:
+        if len(args) != 1:
+            raise RequestError(f"expected {name}")
+        try:
+            return int(args[0])
+        except ValueError:
+            raise RequestError(f"{name} is not an integer: {args[0]}")
+
+    def new(self, connection: dict, args: list):
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise RequestError(f"busy, {len(self.sessions)} sessions")
+        seed = self.integer(args, "SEED") if args else None
+        session = ServerSession(self.next_id, GameSession(self.problem, seed, self.snapshot_every), self.now())
+        self.next_id += 1
+        self.sessions[session.id] = session
+        connection["session"] = session.id
+        return {"session": session.id, "seed": session.game.seed}
+
+    def open(self, connection: dict, args: list):
+        session = self.sessions.get(self.integer(args, "ID"))
+        if session is None:
+            raise RequestError(f"no session {args[0]}")
+        connection["session"] = session.id
+        self.touch(session)
+        return {"session": session.id, "seed": session.game.seed, "step": session.game.step}
+
+    def applicability(self, state) -> tuple:
+        # Whether each operator is applicable, from the state's cached vector when its formulation has one
+        if hasattr(state, "applicability_vector"):
+            return state.applicability_vector()
+        return tuple(op.is_applicable(state) for op in self.operators)
+
+    def ops(self, connection: dict, args: list):
+        state = self.attached(connection).game.state
+        return [[i, op.name] for i, (op, applicable) in enumerate(zip(self.operators, self.applicability(state))) if applicable]
+
+    def apply(self, connection: dict, args: list):
+        game = self.attached(connection).game
+        i = self.integer(args, "INDEX")
+        if not 0 <= i < len(self.operators):
+            raise RequestError(f"there is no operator {i}")
+        if not self.applicability(game.state)[i]:
+            raise RequestError(f"operator {i} is not applicable to the current state")
+        game.apply(i)
+        return {"step": game.step, "goal": game.goal}
+
+    def state(self, connection: dict, args: list):
+        game = self.attached(connection).game
+        reply = {"step": game.step, "goal": game.goal, "text": str(game.state)}
+        if game.goal and hasattr(self.problem, "GOAL_MESSAGE_FUNCTION"):
+            reply["message"] = self.problem.GOAL_MESSAGE_FUNCTION(game.state)
+        return reply
+
+    def undo(self, connection: dict, args: list):
+        game = self.attached(connection).game
+        moved = game.undo()
+        return {"step": game.step, "moved": moved}
+
+    def redo(self, connection: dict, args: list):
+        game = self.attached(connection).game
+        moved = game.redo()
+        return {"step": game.step, "moved": moved}
+
+    def close(self, connection: dict, args: list):
+        session = self.attached(connection)
+        del self.sessions[session.id]
+        return {"session": session.id}
+
+    def stats(self, connection: dict, args: list):
+        return {"sessions": len(self.sessions), "connections": self.connections, "evicted": self.evicted,
+                "requests": self.requests}
+
+    def reply(self, connection: dict, line: bytes) -> str:
+        words = line.decode(errors="replace").split()
+        if not words:
+            return "ERR empty request"
+        command = self.commands.get(words[0].upper())
+        if command is None:
+            return f"ERR unknown command {words[0]}"
+        self.requests += 1
+        try:
+            return f"OK {json.dumps(command(connection, words[1:]), ensure_ascii=False)}"
+        except RequestError as e:
+            return f"ERR {e}"
+        except Exception:
+            # A bug in the problem or the server fails the request, not the connection and its session
+            print(f"Request {line!r} failed:", file=sys.stderr)
+            traceback.print_exc()
+            return "ERR internal error"
+
+    async def handle(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter') -> None:
+        self.connections += 1
+        writer.transport.set_write_buffer_limits(WRITE_BUFFER)
+        connection = {}  # The session the connection uses, under "session"
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:  # Longer than MAX_LINE, the rest of the line cannot be told from the next request
+                    writer.write(b"ERR request too long\n")
+                    break
+                if not line:
+                    break
+                if line.strip().upper() == b"QUIT":
+                    break
+                writer.write(self.reply(connection, line).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 7890, unix: str = None) -> None:
+        if unix:
+            try:
+                # A socket left by an earlier server is replaced, anything else at that path is kept
+                if not stat.S_ISSOCK(os.lstat(unix).st_mode):
+                    raise FileExistsError(f"{unix} exists and is not a socket")
+                os.remove(unix)
+            except FileNotFoundError:
+                pass
+            server = await asyncio.start_unix_server(self.handle, unix, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        evictor = asyncio.create_task(self.evict_forever())
+        print(f"Serving {getattr(self.problem, 'PROBLEM_NAME', 'the problem')} on "
+              + (unix or ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)), flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve many sessions of a SOLUZION problem over a line protocol")
+    parser.add_argument("problem", nargs="?", default="InfoFlow", help="module name of the problem formulation")
+    parser.add_argument("--host", default="127.0.0.1", help="loopback address to serve on")
+    parser.add_argument("--port", type=int, default=7890)
+    parser.add_argument("--unix", help="path of a Unix socket to serve on instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle", type=float, default=300., help="seconds before an unused session is evicted")
+    args = parser.parse_args(argv)
+    if not args.unix and not is_loopback(args.host):
+        parser.error(f"{args.host} is not a loopback address")
+    server = SessionServer(SOLUZION_Loader.load_problem(args.problem), args.max_sessions, args.idle)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except FileExistsError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+"""SOLUZION_Session.py
+ A game session kept as the seed of the game and the index of every
+ operator applied, instead of a stack of every state.
+
+ GameSession(problem, seed) starts problem.new_game(seed) (a copy of the
+ INITIAL_STATE for problems without seeds) and apply(i) plays operator i.
+ A full state is kept every `snapshot_every` moves, so undo(), redo() and
+ jump(n) replay at most snapshot_every - 1 moves from the nearest snapshot
+ at or before step n, and the memory of a long session grows with its moves
+ rather than with its moves times the size of a state. Replays are exact
+ because every random draw of a state comes from its seed (see
+ InfoFlow.State.rng()).
+
+ goal_test() is called exactly once on every state the session reaches,
+ live or replayed, in the order of the moves, as it may mark the game
+ finished on the state (see InfoFlow.State.is_goal()); the clients read its
+ result from `goal` instead of calling it again. A snapshot is a deep copy
+ of the state, and jump() restores a copy of the snapshot, so neither
+ goal_test() nor a client can change a stored state after the fact.
+ Applying an operator after an undo drops the moves that could have been
+ redone, like any editor.
+"""
+import copy
+from array import array
+from random import getrandbits
+
+
+class GameSession:
+    def __init__(self, problem, seed: int = None, snapshot_every: int = 32):
+        self.problem = problem
+        self.operators = problem.OPERATORS
+        self.snapshot_every = snapshot_every
+        if hasattr(problem, "new_game"):
+            self.seed = seed if seed is not None else getrandbits(64)
+            state = problem.new_game(self.seed)
+        else:
+            self.seed = None
+            state = problem.copy_state(problem.INITIAL_STATE)
+        self.moves = array("H")  # Operator index of every move, those after `step` can be redone
+        self.step = 0
+        self.state = state
+        self.goal = problem.goal_test(state)
+        self.snapshots = {0: (self.copy(state), self.goal)}  # Step -> (state, goal), at every multiple of snapshot_every
+
+    def copy(self, state) -> 'object':
+        # An identical state, sharing only the operators (copy_state() would draw a new seed for InfoFlow)
+        return copy.deepcopy(state, {id(op): op for op in self.operators})
+
+    def apply(self, i: int) -> 'object':
+        if self.step < len(self.moves):
+            del self.moves[self.step:]
+            for step in [step for step in self.snapshots if step > self.step]:
+                del self.snapshots[step]
+        self.moves.append(i)
+        self.advance()
+        return self.state
+
+    def advance(self) -> None:
+        # Plays the move after the current step
+        self.state = self.operators[self.moves[self.step]].apply(self.state)
+        self.step += 1
+        self.goal = self.problem.goal_test(self.state)
+        if self.step % self.snapshot_every == 0:
+            self.snapshots[self.step] = (self.copy(self.state), self.goal)
+
+    def jump(self, step: int) -> 'object':
+        if not 0 <= step <= len(self.moves):
+            raise IndexError(f"Step {step} is not between 0 and {len(self.moves)}")
+        if not self.step <= step < self.step + self.snapshot_every:
+            # Going back, or farther than the next snapshot: from the nearest snapshot instead of the current state
+            self.step = step - step % self.snapshot_every
+            state, self.goal = self.snapshots[self.step]
+            self.state = self.copy(state)
+        while self.step < step:
+            self.advance()
+        return self.state
+
+    def undo(self) -> bool:
+        if self.step == 0:
+            return False
+        self.jump(self.step - 1)
+        return True
+
+    def redo(self) -> bool:
+        if self.step == len(self.moves):
+            return False
+        self.jump(self.step + 1)
+        return True
+
+    def can_undo(self) -> bool:
+        return self.step > 0
+
+    def can_redo(self) -> bool:
+        return self.step < len(self.moves)
+
+    @staticmethod
+    def replay(problem, seed: int, moves, snapshot_every: int = 32) -> 'GameSession':
+        # The session of a recorded game, at its last step
+        session = GameSession(problem, seed, snapshot_every)
+        for i in moves:
+            session.apply(i)
+        return session
@@ -73,17 +73,20 @@ problem_name = 'InfoFlow'
 def client_mainloop():
   print(TITLE)
   print(PROBLEM.PROBLEM_NAME+"; "+PROBLEM.PROBLEM_VERSION)
-  global STEP, DEPTH, OPERATORS, CURRENT_STATE, STATE_STACK
-  CURRENT_STATE = PROBLEM.copy_state(PROBLEM.INITIAL_STATE)  
+  global STEP, DEPTH, OPERATORS, CURRENT_STATE, SESSION
+  SESSION = SOLUZION_Session.GameSession(PROBLEM)
+  CURRENT_STATE = SESSION.state
 
-  STATE_STACK = [CURRENT_STATE]
   STEP = 0
   DEPTH = 0
+  goal_step = None  # The step whose goal was announced, goal_test() is only called once per state by the session
   PROBLEM.render_state(CURRENT_STATE)
+  SOLUZION_Loader.report_first_state(PROBLEM)
   while(True):
     print("\nStep "+str(STEP)+", Depth "+str(DEPTH))
     print("CURRENT_STATE = "+str(CURRENT_STATE))
-    if PROBLEM.goal_test(CURRENT_STATE):
+    if SESSION.goal and goal_step != SESSION.step:
+      goal_step = SESSION.step
       print('''CONGRATULATIONS!
 You have solved the problem by reaching a goal state.
 Do you wish to continue exploring?
@@ -97,16 +100,25 @@ Do you wish to continue exploring?
     for i in range(len(OPERATORS)):
       if applicability_vector[i]:
         print(str(i)+": "+OPERATORS[i].name)
-    command = input("Enter command: 0, 1, 2, etc. for operator; B-back; H-help; Q-quit. >> ")
+    command = input("Enter command: 0, 1, 2, etc. for operator; B-back; R-redo; H-help; Q-quit. >> ")
     if command=="B" or command=="b": 
-      if len(STATE_STACK)>1:
-        STATE_STACK.pop()
+      if SESSION.undo():
         DEPTH -= 1
         STEP += 1
       else:
         print("You're already back at the initial state.")
         continue
-      CURRENT_STATE = STATE_STACK[-1]
+      CURRENT_STATE = SESSION.state
+      PROBLEM.render_state(CURRENT_STATE)
+      continue
+    if command=="R" or command=="r":
+      if SESSION.redo():
+        DEPTH += 1
+        STEP += 1
+      else:
+        print("There is no step to redo.")
+        continue
+      CURRENT_STATE = SESSION.state
       PROBLEM.render_state(CURRENT_STATE)
       continue
 
@@ -123,8 +135,7 @@ Do you wish to continue exploring?
       print("There is no operator with number "+str(i))
       continue
     if applicability_vector[i]:
-       CURRENT_STATE = OPERATORS[i].apply(CURRENT_STATE)
-       STATE_STACK.append(CURRENT_STATE)
+       CURRENT_STATE = SESSION.apply(i)
        PROBLEM.render_state(CURRENT_STATE)
        DEPTH += 1
        STEP += 1
@@ -136,7 +147,9 @@ Do you wish to continue exploring?
 
 def get_applicability_vector(s):
     #print("OPERATORS: "+str(OPERATORS))
-    return [op.is_applicable(s) for op in OPERATORS]  
+    if hasattr(s, "applicability_vector"):
+        return s.applicability_vector()  # Cached by the state itself
+    return [op.is_applicable(s) for op in OPERATORS]
 
 def exit_client():
   print("Terminating Text_SOLUZION_Client session.")
@@ -154,7 +167,7 @@ The program shows you a list of what operators are
 applicable in the current state.
 
 You can also go backwards (undoing a previous step)
-by typing 'B'.  
+by typing 'B', and forwards again (redoing it) by typing 'R'.  
 
 If you reach a goal state, you have solved the problem,
 and the computer will usually tell you that, but it depends
@@ -171,9 +184,11 @@ def apply_one_op():
 def applicable_ops(s):
     """Returns the subset of OPERATORS whose preconditions are
        satisfied by the state s."""
-    return [o for o in OPERATORS if o.is_applicable(s)]
+    return [o for o, applicable in zip(OPERATORS, get_applicability_vector(s)) if applicable]
 
-import sys, importlib.util
+import sys
+import SOLUZION_Loader
+import SOLUZION_Session
 
 # Get the PROBLEM name from the command-line arguments
 
@@ -194,19 +209,14 @@ problem_name = sys.argv[1]
 print("problem_name = "+problem_name)
 
 try:
-  spec = importlib.util.spec_from_file_location(problem_name, problem_name+".py")
-  PROBLEM = spec.loader.load_module()
-  spec.loader.exec_module(PROBLEM)
+  PROBLEM = SOLUZION_Loader.load_problem(problem_name)
 except Exception as e:
   print(e)
   raise e
   exit(1)
 
 try:
-  spec = importlib.util.spec_from_file_location(problem_name+'_Array_VIS_FOR_TK',
-                                                problem_name+'_Array_VIS_FOR_TK.py')
-  VIS = spec.loader.load_module()
-  spec.loader.exec_module(VIS)
+  VIS = SOLUZION_Loader.load_module(problem_name+'_Array_VIS_FOR_TK')
   print("Using TK vis routine")
   PROBLEM.render_state = VIS.render_state
   VIS.initialize_vis()
@@ -217,7 +227,7 @@ except Exception as e:
 
 
 OPERATORS=PROBLEM.OPERATORS
-STATE_STACK = []
+SESSION = None
 TITLE="Tk_SOLUZION_Client (Version 0-1)"
 
 import threading
@@ -0,0 +1,47 @@
+import random
+from collections import Counter
+
+import pytest
+
+from InfoFlow import ContentPool, ContentStore
+
+
+def letters() -> 'ContentPool':
+    # 26 entries in 3 categories of 9, 9 and 8
+    return ContentPool("abcdefghijklmnopqrstuvwxyz", lambda letter: (ord(letter) - ord("a")) // 9)
+
+
+def test_a_sample_is_distinct_and_bounded_by_the_pool():
+    pool = letters()
+    rng = random.Random(1)
+    for k in (0, 1, 13, 26):
+        ids = pool.sample(k, rng)
+        assert len(ids) == len(set(ids)) == k and all(0 <= ind < len(pool) for ind in ids)
+    with pytest.raises(ValueError):
+        pool.sample(27, rng)
+
+
+def test_a_balanced_sample_spreads_over_the_categories():
+    pool = letters()
+    ids = pool.sample_balanced(7, rng=random.Random(2))
+    assert len(set(ids)) == 7
+    assert sorted(Counter(pool.categories[ind] for ind in ids).values()) == [2, 2, 3]
+    with pytest.raises(ValueError):
+        pool.sample_balanced(9, categories=[2], rng=random.Random(2))
+
+
+def test_a_store_loads_its_categories_and_reads_entries_on_demand(tmp_path):
+    path = str(tmp_path / "content.sqlite")
+    pool = letters()
+    ContentStore.write(path, {"letters": (pool, lambda letter: pool.categories[pool.entries.index(letter)], lambda letter: [letter])})
+    store = ContentStore.load("letters", lambda args: args[0], path)
+    assert len(store) == len(pool) and not store.cache
+    assert {category: len(ids) for category, ids in store.ids_by_category.items()} == {0: 9, 1: 9, 2: 8}
+    for ind in (0, 8, 9, 25):
+        assert store[ind] == pool[ind] and store.categories[ind] == pool.categories[ind]
+    assert sorted(store.cache) == [0, 8, 9, 25]
+    assert list(store) == list(pool)
+    with pytest.raises(IndexError):
+        store[26]
+    assert ContentStore.load("numbers", tuple, path) is None
+    assert ContentStore.load("letters", tuple, str(tmp_path / "missing.sqlite")) is None
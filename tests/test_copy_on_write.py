@@ -0,0 +1,23 @@
+import random
+
+import InfoFlow
+
+
+def test_successors_never_change_their_parent():
+    played = set()
+    for seed in range(6):
+        state, rng = InfoFlow.new_game(seed), random.Random(seed)
+        for _ in range(300):
+            if InfoFlow.goal_test(state):
+                break
+            key, text = state.key(), str(state)
+            successors = [op.apply(state) for op in InfoFlow.OPERATORS if op.is_applicable(state)]
+            for successor in successors:
+                # The successors share what they did not change with the parent and with each other
+                str(successor)
+                successor.key()
+            assert state.key() == key and str(state) == text
+            if state.player.current_challenge is not None:
+                played.add(type(state.player.current_challenge))
+            state = rng.choice(successors)
+    assert len(played) == len(InfoFlow.Challenges.all)
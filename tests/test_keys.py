@@ -0,0 +1,62 @@
+import copy
+import random
+
+import InfoFlow
+
+
+def states(seed: int, steps: int = 200) -> list:
+    state, rng, reached = InfoFlow.new_game(seed), random.Random(seed), []
+    for _ in range(steps):
+        reached.append(state)
+        if InfoFlow.goal_test(state):
+            break
+        state = rng.choice([op for op in InfoFlow.OPERATORS if op.is_applicable(state)]).apply(state)
+    return reached
+
+
+def test_equal_keys_make_equal_states_and_hashes():
+    for state in states(1):
+        clone = copy.copy(state)
+        assert clone.key() == state.key()
+        assert clone == state and hash(clone) == hash(state)
+
+
+def test_states_of_different_progress_differ():
+    reached = states(2)
+    distinct = {state.key() for state in reached}
+    assert len(set(reached)) == len(distinct) > 1
+    assert reached[0] != reached[1] and reached[0] != "not a state"
+
+
+def test_players_and_challenges_compare_by_content():
+    player = InfoFlow.PlayerInfo()
+    clone = InfoFlow.PlayerInfo.clone(player)
+    assert clone == player and hash(clone) == hash(player)
+    clone.money += 1
+    assert clone != player
+    challenge = InfoFlow.MinerChallenge.random(0, random.Random(3))
+    assert challenge.clone() == challenge and hash(challenge.clone()) == hash(challenge)
+
+
+def test_keying_a_challenge_menu_does_not_draw_its_offer():
+    menu = next(state for state in states(3) if isinstance(state, InfoFlow.ChallengeMenuState))
+    menu = copy.copy(menu)
+    menu._offer = None
+    key = menu.key()
+    seen = {menu}
+    assert menu == copy.copy(menu) and menu._offer is None
+    str(menu)
+    assert menu._offer is not None and menu.key() == key and menu in seen
+
+
+def test_a_pooled_offer_is_keyed_by_its_content():
+    pool = InfoFlow.ChallengePool(seed=1).install()
+    try:
+        menus = [InfoFlow.ChallengeMenuState(InfoFlow.new_game(4)) for _ in range(2)]
+    finally:
+        pool.uninstall()
+    assert all(menu._offer is not None for menu in menus)
+    key = menus[0].key()
+    str(menus[0])
+    assert menus[0].key() == key
+    assert (menus[0].key() == menus[1].key()) == (menus[0].random_challenge[0] == menus[1].random_challenge[0])
@@ -0,0 +1,28 @@
+import InfoFlow
+from InfoFlow import MessageDisplayState
+
+
+def test_queued_messages_share_the_target():
+    target = InfoFlow.new_game(3)
+    queue = MessageDisplayState.show_message(target, "First", "one")
+    for ind in range(9):
+        queue = queue.before("More", str(ind))
+    state = queue
+    while isinstance(state, MessageDisplayState):
+        assert state.player is target.player and state.challenge is target.challenge
+        state = state.continue_to
+    assert state is target
+
+
+def test_testing_the_goal_message_leaves_the_target_unchanged():
+    state = InfoFlow.new_game(5)
+    state.player.debt = 0
+    queue = state.check_win_lose_state()
+    target = queue.target
+    text, key = str(target), target.key()
+    goals = []
+    while isinstance(queue, MessageDisplayState):
+        goals.append(InfoFlow.goal_test(queue))
+        queue = queue.continue_to
+    assert goals == [False, True]
+    assert target.key() == key and str(target) == text and not InfoFlow.goal_test(target)
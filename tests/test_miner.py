@@ -0,0 +1,69 @@
+import random
+from heapq import heappush, heappop
+
+from InfoFlow import MinerChallenge
+from InfoFlow_Miner import search_route
+
+
+def reference_gain(map: bytes, n: int) -> int:
+    # Best-first over (position, every cell collected) with only the step count bound, slow but plainly exact
+    points, step, useful, dest = MinerChallenge.points_of_cell, MinerChallenge.points_of_step, MinerChallenge.USEFUL, n * n - 1
+
+    def bound(g, position, left):
+        return g + left * points[useful] + step * max(2 * (n - 1) - position % n - position // n, left + 1)
+
+    best, seen = None, {}
+    heap = [(-bound(0, 0, map.count(useful)), 0, 0, 0, map.count(useful))]
+    while heap:
+        negative_bound, g, position, collected, left = heappop(heap)
+        if best is not None and -negative_bound <= best:
+            return best
+        for off_x, off_y in MinerChallenge.offsets:
+            if 0 <= position % n + off_x < n and 0 <= position // n + off_y < n:
+                following = position + off_y * n + off_x
+                cell = 0 if collected >> following & 1 else map[following]
+                following_g = -g + points[cell] + step
+                if following == dest:
+                    best = following_g if best is None else max(best, following_g)
+                    continue
+                following_collected = collected | 1 << following if cell else collected
+                if seen.get((following, following_collected), following_g - 1) < following_g:
+                    seen[(following, following_collected)] = following_g
+                    heappush(heap, (-bound(following_g, following, left - (cell == useful)), -following_g, following,
+                                    following_collected, left - (cell == useful)))
+    return best
+
+
+def walk(challenge: 'MinerChallenge', moves: tuple) -> 'MinerChallenge':
+    challenge = challenge.clone()
+    for move in moves:
+        assert challenge.can_move(*move)
+        challenge.move(*move)
+    return challenge
+
+
+def test_routes_are_optimal_on_small_maps():
+    rng = random.Random(5)
+    for level in (0, 0, 0, 1, 1):
+        challenge = MinerChallenge.random(level, rng)
+        route = search_route(challenge.map, challenge.map_size, 0, 0)
+        assert route.optimal
+        assert route.gain == reference_gain(challenge.map, challenge.map_size)
+
+
+def test_routes_end_at_the_destination_with_their_gain():
+    rng = random.Random(6)
+    for level in range(5):
+        challenge = MinerChallenge.random(level, rng)
+        for budget in (0, 1000):
+            route = search_route(challenge.map, challenge.map_size, 0, 0, budget)
+            walked = walk(challenge, route.moves)
+            assert walked.is_at_dest() and walked.partial_score() == route.gain
+            assert route.optimal or route.nodes == budget
+
+
+def test_best_route_resumes_from_the_position():
+    challenge = MinerChallenge.random(2, random.Random(7))
+    route = challenge.best_route()
+    halfway = walk(challenge, route.moves[:len(route.moves) // 2])
+    assert halfway.best_score() == challenge.best_score() == route.gain
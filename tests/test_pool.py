@@ -0,0 +1,24 @@
+import random
+
+from InfoFlow import ChallengePool, Challenges
+
+
+def requests(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [(rng.randrange(5), rng.randrange(len(Challenges.all))) for _ in range(count)]
+
+
+def test_the_challenges_handed_out_do_not_depend_on_the_refills():
+    asked = requests(60, 3)
+    empty, filled = ChallengePool(2, seed=7), ChallengePool(2, seed=7)
+    filled.fill()
+    handed = [], []
+    for ind, (level, kind) in enumerate(asked):
+        handed[0].append(empty.take(level, kind))
+        handed[1].append(filled.take(level, kind))
+        if ind % 7 == 0:
+            filled.fill()
+    assert handed[0] == handed[1]
+    assert [challenge.level for challenge in handed[1]] == [level for level, _ in asked]
+    assert empty.hits == 0 and filled.hits > 0 and filled.hits + filled.misses == len(asked)
+    assert handed[1] != [ChallengePool(2, seed=8).take(level, kind) for level, kind in asked]
@@ -0,0 +1,44 @@
+import random
+
+import InfoFlow
+
+
+def random_play(seed: int, pick: int, steps: int = 300) -> list:
+    # (operator index, text of the state it was applied to) of every move
+    state, rng, moves = InfoFlow.new_game(seed), random.Random(pick), []
+    for _ in range(steps):
+        if InfoFlow.goal_test(state):
+            break
+        i = rng.choice([i for i, applicable in enumerate(state.applicability_vector()) if applicable])
+        moves.append((i, str(state)))
+        state = InfoFlow.OPERATORS[i].apply(state)
+    return moves
+
+
+def test_a_seed_and_the_operators_replay_a_game():
+    moves = random_play(42, 1)
+    assert moves == random_play(42, 1)
+    state = InfoFlow.new_game(42)
+    for i, text in moves:
+        assert str(state) == text
+        state = InfoFlow.OPERATORS[i].apply(state)
+
+
+def test_seeds_draw_different_games():
+    assert random_play(42, 1) != random_play(43, 1)
+
+
+def test_states_draw_from_their_own_seed():
+    # Drawing from the global random module between moves changes nothing
+    state = InfoFlow.new_game(7)
+    rng = random.Random(0)
+    expected = []
+    for _ in range(100):
+        i = rng.choice([i for i, applicable in enumerate(state.applicability_vector()) if applicable])
+        expected.append(i)
+        state = InfoFlow.OPERATORS[i].apply(state)
+    replayed = InfoFlow.new_game(7)
+    for i in expected:
+        random.random()
+        replayed = InfoFlow.OPERATORS[i].apply(replayed)
+    assert str(replayed) == str(state) and replayed.key() == state.key()
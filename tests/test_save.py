@@ -0,0 +1,57 @@
+import io
+import random
+
+import pytest
+
+import InfoFlow
+from InfoFlow_Save import GameReader, GameWriter, decode, encode
+from SOLUZION_Session import GameSession
+
+
+def states(seed: int, steps: int = 300) -> list:
+    state, rng, reached = InfoFlow.new_game(seed), random.Random(seed), []
+    for _ in range(steps):
+        reached.append(state)
+        if InfoFlow.goal_test(state):
+            break
+        state = rng.choice([op for op in InfoFlow.OPERATORS if op.is_applicable(state)]).apply(state)
+    return reached
+
+
+def test_states_round_trip():
+    for seed in range(5):
+        for state in states(seed):
+            decoded = decode(encode(state))
+            assert type(decoded) is type(state)
+            assert decoded.key() == state.key() and str(decoded) == str(state)
+            assert decoded.applicable_op_ids() == state.applicable_op_ids()
+            for op in InfoFlow.OPERATORS:
+                if op.is_applicable(state):
+                    assert op.apply(decoded).key() == op.apply(state).key()
+
+
+def test_a_file_round_trips_states_and_sessions():
+    saved = states(6)
+    session = GameSession(InfoFlow, 9, 4)
+    rng = random.Random(9)
+    for _ in range(60):
+        session.apply(rng.choice([i for i, op in enumerate(InfoFlow.OPERATORS) if op.is_applicable(session.state)]))
+    session.undo()
+    file = io.BytesIO()
+    writer = GameWriter(file)
+    writer.write_all(saved)
+    writer.write(session)
+    file.seek(0)
+    loaded = list(GameReader(file))
+    assert [state.key() for state in loaded[:-1]] == [state.key() for state in saved]
+    restored = loaded[-1]
+    assert (restored.seed, restored.step, list(restored.moves)) == (9, 59, list(session.moves))
+    assert restored.state.key() == session.state.key() and restored.redo()
+    file.seek(0)
+    summaries = list(GameReader(file).summaries())
+    assert [(s.round, s.money, s.seed) for s in summaries[:-1]] == [(s.round, s.player.money, s.seed) for s in saved]
+
+
+def test_a_foreign_file_is_refused():
+    with pytest.raises(ValueError):
+        GameReader(io.BytesIO(b"not a save file at all, not at all"))
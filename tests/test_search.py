@@ -0,0 +1,16 @@
+import InfoFlow
+import InfoFlow_Search
+
+
+def depth(node: 'InfoFlow_Search.SearchNode') -> int:
+    return 1 + max((depth(child) for child in node.children.values()), default=0)
+
+
+def test_samples_of_the_chance_outcomes_share_the_tree():
+    menu = InfoFlow.ChallengeMenuState(InfoFlow.new_game(1))
+    search = InfoFlow_Search.GameTreeSearch(InfoFlow, nodes=300, seed=1)
+    op = search.best_operator(menu)
+    tree = search.table.get(menu)
+    assert op.id in tree.children and tree.visits == 300
+    assert sum(child.visits for child in tree.children.values()) == 300
+    assert depth(tree) > 3
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+import InfoFlow
+from SOLUZION_Server import MAX_LINE, SessionServer, is_loopback
+
+
+async def converse(server: 'SessionServer', lines: list) -> list:
+    # The replies of one connection to the requests, over loopback TCP
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0, limit=MAX_LINE)
+    reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+    replies = []
+    for line in lines:
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        replies.append((await reader.readline()).decode().rstrip("\n"))
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return replies
+
+
+def talk(lines: list, server: 'SessionServer' = None) -> list:
+    return asyncio.run(converse(server or SessionServer(InfoFlow), lines))
+
+
+def payload(reply: str):
+    assert reply.startswith("OK "), reply
+    return json.loads(reply[3:])
+
+
+def test_a_session_is_played_over_the_protocol():
+    replies = talk(["NEW 11", "OPS", "STATE"])
+    assert payload(replies[0]) == {"session": 1, "seed": 11}
+    ops = payload(replies[1])
+    assert ops and all(InfoFlow.OPERATORS[i].name == name for i, name in ops)
+    assert payload(replies[2])["step"] == 0
+    replies = talk(["NEW 11", f"APPLY {ops[0][0]}", "UNDO", "UNDO", "REDO", "CLOSE"])
+    assert payload(replies[1]) == {"step": 1, "goal": False}
+    assert payload(replies[2]) == {"step": 0, "moved": True}
+    assert payload(replies[3]) == {"step": 0, "moved": False}
+    assert payload(replies[4]) == {"step": 1, "moved": True}
+    assert payload(replies[5]) == {"session": 1}
+
+
+def test_bad_requests_get_errors_and_keep_the_connection():
+    replies = talk(["OPS", "FLY", "NEW x", "NEW 3", "APPLY 9999", "APPLY", "OPEN 42", "CLOSE", "OPS", "STATS"])
+    assert replies[0] == "ERR no session, start one with NEW"
+    assert replies[1] == "ERR unknown command FLY"
+    assert replies[2] == "ERR SEED is not an integer: x"
+    assert replies[4] == "ERR there is no operator 9999"
+    assert replies[5] == "ERR expected INDEX"
+    assert replies[6] == "ERR no session 42"
+    assert replies[8] == "ERR the session has ended"
+    assert payload(replies[9])["sessions"] == 0
+
+
+def test_an_operator_that_is_not_applicable_is_refused():
+    server = SessionServer(InfoFlow)
+    replies = talk(["NEW 5", "OPS"], server)
+    applicable = {i for i, _ in payload(replies[1])}
+    refused = next(i for i in range(len(InfoFlow.OPERATORS)) if i not in applicable)
+    assert talk(["OPEN 1", f"APPLY {refused}"], server)[1] == f"ERR operator {refused} is not applicable to the current state"
+
+
+def test_a_failing_command_is_an_internal_error(capsys):
+    server = SessionServer(InfoFlow)
+
+    def fail(connection, args):
+        raise ZeroDivisionError
+
+    server.commands["OPS"] = fail
+    replies = talk(["NEW 1", "OPS", "STATE"], server)
+    assert replies[1] == "ERR internal error"
+    assert payload(replies[2])["step"] == 0
+    assert "ZeroDivisionError" in capsys.readouterr().err
+
+
+def test_sessions_past_the_limit_are_refused():
+    assert talk(["NEW", "NEW"], SessionServer(InfoFlow, max_sessions=1))[1] == "ERR busy, 1 sessions"
+
+
+def test_only_loopback_hosts_are_served():
+    assert is_loopback("127.0.0.1") and is_loopback("::1") and is_loopback("localhost")
+    assert not is_loopback("10.0.0.1") and not is_loopback("2001:db8::1")
+
+
+def test_a_unix_path_that_is_not_a_socket_is_kept(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        asyncio.run(SessionServer(InfoFlow).serve(unix=str(path)))
+    assert path.read_text() == "keep me"
@@ -0,0 +1,72 @@
+import random
+
+import InfoFlow
+from InfoFlow_Simulator import suggested_policy
+from SOLUZION_Session import GameSession
+
+
+def play_to_goal(seed: int, snapshot_every: int) -> 'GameSession':
+    session = GameSession(InfoFlow, seed, snapshot_every)
+    rng = random.Random(seed)
+    while not session.goal:
+        assert session.step < 1000, "the suggested play should reach the goal"
+        legal = [i for i, applicable in enumerate(session.state.applicability_vector()) if applicable]
+        session.apply(suggested_policy(InfoFlow, session.state, legal, rng))
+    return session
+
+
+def test_replays_through_the_goal_from_a_snapshot():
+    # The goal is past the last snapshot, so jump() replays the goal message from a snapshot taken before it
+    session = play_to_goal(0, 5)
+    goal = session.step
+    assert goal % 5 != 0
+    text = str(session.state)
+    session.jump(0)
+    assert not session.goal
+    session.jump(goal)
+    assert session.goal and str(session.state) == text
+    assert session.undo() and not session.goal
+    assert session.redo() and session.goal
+
+
+def test_snapshots_do_not_share_the_live_state():
+    # Neither the live state a snapshot was taken of nor a state restored from it may change the snapshot
+    session = play_to_goal(4, 5)
+    session.jump(5)
+    session.state.round = 0
+    session.jump(0)
+    session.jump(10)
+    session.state.round = 0
+    session.jump(5)
+    assert session.state.round > 0
+    session.jump(10)
+    assert session.state.round > 0
+
+
+def test_undo_and_redo_walk_the_recorded_states():
+    session = play_to_goal(1, 3)
+    live = []
+    while True:
+        live.append((str(session.state), session.goal))
+        if not session.undo():
+            break
+    live.reverse()
+    while session.redo():
+        assert (str(session.state), session.goal) == live[session.step]
+    for step in (7, 0, len(live) - 1, 4):
+        session.jump(step)
+        assert (str(session.state), session.goal) == live[step]
+
+
+def test_replay_reaches_the_same_state():
+    session = play_to_goal(2, 4)
+    replayed = GameSession.replay(InfoFlow, session.seed, session.moves, 7)
+    assert str(replayed.state) == str(session.state) and replayed.goal
+
+
+def test_apply_after_undo_drops_the_redo_moves():
+    session = play_to_goal(3, 4)
+    session.jump(10)
+    session.apply(next(i for i, applicable in enumerate(session.state.applicability_vector()) if applicable))
+    assert session.step == len(session.moves) == 11 and not session.can_redo()
+    assert max(session.snapshots) <= 11